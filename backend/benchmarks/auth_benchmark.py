@@ -0,0 +1,59 @@
+"""Microbenchmark of per-request authentication cost.
+
+Compares the old `supabase.auth.get_user` round-trip with local JWT
+verification through `TokenVerifier`, both on a cold cache (signature check
+on every call) and a warm cache (the steady state for a signed-in user).
+
+The remote measurement only runs when `SUPABASE_URL`, `SUPABASE_KEY` and
+`BENCH_ACCESS_TOKEN` are set; the local ones use a freshly minted HS256 token.
+
+Usage:
+    python -m benchmarks.auth_benchmark [iterations]
+"""
+import os
+import sys
+import time
+import secrets
+import statistics
+import jwt
+from src.common.security.token_verifier import TokenVerifier
+
+def _measure(label: str, func, iterations: int) -> None:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    samples.sort()
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"{label:<28} median {statistics.median(samples):>10.1f} us   p99 {p99:>10.1f} us")
+
+def main(iterations: int) -> None:
+    secret = secrets.token_urlsafe(32)
+    token = jwt.encode(
+        {"sub": "00000000-0000-0000-0000-000000000000", "aud": "authenticated", "exp": int(time.time()) + 3600},
+        secret,
+        algorithm="HS256",
+    )
+
+    cold = TokenVerifier(secret=secret, audience="authenticated", cache_size=1)
+    def verify_cold():
+        cold._claims.clear()
+        cold.verify(token)
+
+    warm = TokenVerifier(secret=secret, audience="authenticated")
+    warm.verify(token)
+
+    remote_token = os.getenv("BENCH_ACCESS_TOKEN")
+    if remote_token and os.getenv("SUPABASE_URL") and os.getenv("SUPABASE_KEY"):
+        from supabase import create_client
+        client = create_client(os.environ["SUPABASE_URL"], os.environ["SUPABASE_KEY"])
+        _measure("before: supabase get_user", lambda: client.auth.get_user(remote_token), min(iterations, 50))
+    else:
+        print("before: supabase get_user    skipped (set SUPABASE_URL, SUPABASE_KEY, BENCH_ACCESS_TOKEN)")
+
+    _measure("after: local verify (cold)", verify_cold, iterations)
+    _measure("after: local verify (warm)", lambda: warm.verify(token), iterations)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
@@ -0,0 +1,126 @@
+"""A minimal OpenAI-compatible chat completions server for local benchmarks.
+
+Replies with a fixed answer after a per-model delay, either as a single JSON
+body or as an SSE stream, so routing and client behaviour can be measured
+without calling a real provider. A model can also be given a slow tail (a
+fraction of requests delayed much longer) or a fixed error status.
+
+Usage:
+    python -m benchmarks.fake_openai_server --port 8808 --latency fast-model=0.05 --latency strong-model=0.4
+"""
+import time
+import json
+import random
+import socket
+import asyncio
+import argparse
+import threading
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+ANSWER = "This is a canned answer from the fake server."
+
+def create_app(
+    latencies: dict[str, float],
+    default_latency: float = 0.1,
+    chunks: int = 8,
+    chunk_delay: float = 0.0,
+    slow_tail: dict[str, tuple[float, float]] | None = None,
+    errors: dict[str, int] | None = None,
+    seed: int = 0,
+) -> FastAPI:
+    """Build the app.
+
+    Args:
+        latencies: Delay before the first token, per model.
+        chunk_delay: Delay between streamed chunks.
+        slow_tail: Per model, a (probability, delay) pair for slow responses.
+        errors: Per model, an HTTP status to fail every request with.
+    """
+    app = FastAPI()
+    app.state.requests = []
+    app.state.latencies = latencies
+    app.state.chunk_delay = chunk_delay
+    app.state.slow_tail = slow_tail or {}
+    app.state.errors = errors or {}
+    rng = random.Random(seed)
+
+    @app.post("/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body["model"]
+        app.state.requests.append(model)
+
+        status = app.state.errors.get(model)
+        if status is not None:
+            return JSONResponse({"error": {"message": "injected failure", "code": status}}, status_code=status)
+
+        delay = app.state.latencies.get(model, default_latency)
+        probability, slow_delay = app.state.slow_tail.get(model, (0.0, 0.0))
+        if rng.random() < probability:
+            delay = slow_delay
+        await asyncio.sleep(delay)
+        created = int(time.time())
+
+        if not body.get("stream"):
+            return {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": ANSWER}}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            }
+
+        words = ANSWER.split(" ")
+        step = max(1, len(words) // chunks)
+
+        async def events():
+            for i in range(0, len(words), step):
+                if i and app.state.chunk_delay:
+                    await asyncio.sleep(app.state.chunk_delay)
+                delta = " ".join(words[i:i + step]) + ("" if i + step >= len(words) else " ")
+                chunk = {
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"role": "assistant", "content": delta}, "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+            done = {**chunk, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+            yield f"data: {json.dumps(done)}\n\n"
+            if body.get("stream_options", {}).get("include_usage"):
+                prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in body["messages"])
+                usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(words), "total_tokens": prompt_tokens + len(words)}
+                yield f"data: {json.dumps({**chunk, 'choices': [], 'usage': usage})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def serve_in_background(app: FastAPI, port: int) -> uvicorn.Server:
+    """Start the server on a daemon thread and wait until it accepts connections."""
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+def _parse_latency(value: str) -> tuple[str, float]:
+    model, _, seconds = value.rpartition("=")
+    return model, float(seconds)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8808)
+    parser.add_argument("--latency", type=_parse_latency, action="append", default=[])
+    args = parser.parse_args()
+    uvicorn.run(create_app(dict(args.latency)), host="127.0.0.1", port=args.port)
@@ -0,0 +1,68 @@
+"""Tail latency and failover of the hedged LLM client against fake servers.
+
+The primary model answers in 150 ms, except for 10% of requests that take
+3 s; the secondary always answers in 300 ms. The same sequence of requests
+is run with hedging off and on (hedge after 500 ms), and the p50/p95/p99
+are compared. A final run fails the primary with 429s to show the circuit
+breaker opening and traffic failing over to the secondary.
+
+Usage:
+    python -m benchmarks.hedging_benchmark [requests]
+"""
+import os
+import sys
+import time
+import asyncio
+from statistics import quantiles
+from benchmarks.fake_openai_server import create_app, free_port, serve_in_background
+
+PRIMARY = "fake/primary"
+SECONDARY = "fake/secondary"
+PORT = free_port()
+
+os.environ["OPENROUTER_URL"] = f"http://127.0.0.1:{PORT}"
+os.environ["OPENROUTER_API_KEY"] = "fake"
+
+from src.modules.chat.agents.llm_factory import get_breaker, get_chat_model
+from src.modules.chat.agents.resilient_llm import Endpoint, ResilientChatModel
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+def build_model(hedge_delay: float | None) -> ResilientChatModel:
+    return ResilientChatModel(
+        [Endpoint(model, get_chat_model(model, 0.5, max_retries=0), get_breaker(model)) for model in (PRIMARY, SECONDARY)],
+        hedge_delay=hedge_delay,
+    )
+
+async def run(model: ResilientChatModel, requests: int) -> list[float]:
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        await model.ainvoke(MESSAGES)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+def report(label: str, latencies: list[float]) -> None:
+    cuts = quantiles(latencies, n=100)
+    print(f"{label:<22}p50={cuts[49] * 1000:6.0f}ms  p95={cuts[94] * 1000:6.0f}ms  p99={cuts[98] * 1000:6.0f}ms")
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    app = create_app({PRIMARY: 0.15, SECONDARY: 0.3}, slow_tail={PRIMARY: (0.1, 3.0)})
+    serve_in_background(app, PORT)
+
+    # Warm up the clients so connection setup is not counted
+    asyncio.run(run(build_model(None), 2))
+    report("no hedging", asyncio.run(run(build_model(None), requests)))
+    report("hedge after 500ms", asyncio.run(run(build_model(0.5), requests)))
+
+    app.state.errors[PRIMARY] = 429
+    app.state.requests.clear()
+    asyncio.run(run(build_model(0.5), 20))
+    print("\nprimary failing with 429 over 20 requests:")
+    print(f"  calls to primary:   {app.state.requests.count(PRIMARY)}")
+    print(f"  calls to secondary: {app.state.requests.count(SECONDARY)}")
+    print(f"  primary breaker:    {get_breaker(PRIMARY).state}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""End-to-end latency of model routing against a fake OpenAI-compatible server.
+
+Runs a fixed corpus through `main_agent.ainvoke` twice: once with every turn
+sent to the strong model (the previous behaviour) and once with the router
+splitting turns between the fast and strong tiers. The fake server answers
+the fast model after 50 ms and the strong model after 400 ms.
+
+Usage:
+    python -m benchmarks.model_router_benchmark
+"""
+import os
+import time
+import asyncio
+from prometheus_client import REGISTRY
+from benchmarks.fake_openai_server import create_app, free_port, serve_in_background
+
+FAST_MODEL = "fake/fast"
+STRONG_MODEL = "fake/strong"
+PORT = free_port()
+
+# Settings are read at import time, so point them at the fake server first
+os.environ["OPENROUTER_URL"] = f"http://127.0.0.1:{PORT}"
+os.environ["OPENROUTER_API_KEY"] = "fake"
+os.environ["FAST_MODELS"] = f'["{FAST_MODEL}"]'
+os.environ["STRONG_MODELS"] = f'["{STRONG_MODEL}"]'
+
+from src.modules.chat.agents import main_agent
+from benchmarks.tool_binding_benchmark import CORPUS
+
+def routing_decisions() -> dict[tuple[str, str, str], float]:
+    return {
+        (sample.labels["tier"], sample.labels["reason"], sample.labels["model"]): sample.value
+        for metric in REGISTRY.collect() if metric.name == "llm_router_decisions"
+        for sample in metric.samples if sample.name.endswith("_total")
+    }
+
+async def run_corpus() -> float:
+    started = time.perf_counter()
+    for prompt in CORPUS:
+        await main_agent.ainvoke([{"role": "user", "content": prompt}])
+    return time.perf_counter() - started
+
+def main():
+    app = create_app({FAST_MODEL: 0.05, STRONG_MODEL: 0.4})
+    serve_in_background(app, PORT)
+
+    router = main_agent.model_router
+    router.tiers["fast"] = router.tiers["strong"]
+    baseline = asyncio.run(run_corpus())
+
+    router.tiers["fast"] = (FAST_MODEL,)
+    before = routing_decisions()
+    routed = asyncio.run(run_corpus())
+    decisions = {key: count - before.get(key, 0) for key, count in routing_decisions().items()}
+
+    print(f"{'prompts':<28}{len(CORPUS)}")
+    print(f"{'strong model only (s)':<28}{baseline:.2f}")
+    print(f"{'routed (s)':<28}{routed:.2f}")
+    for (tier, reason, model), count in decisions.items():
+        if count:
+            print(f"  {tier:<8}{reason:<14}{model:<14}{count:.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Import-time breakdown of the application, in the spirit of `python -X importtime`.
+
+Imports `src.app` in fresh interpreters with `-X importtime`, then reports the
+total and the slowest modules by cumulative time, plus self time grouped by
+top-level package. The first run is discarded so bytecode compilation does
+not skew the numbers.
+
+Usage:
+    python -m benchmarks.startup_report [runs] [top]
+"""
+import os
+import sys
+import statistics
+import subprocess
+from collections import defaultdict
+
+TARGET = "src.app"
+
+def _import_times() -> dict[str, tuple[int, int]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {TARGET}"],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"import {TARGET} failed:\n{proc.stderr[-2000:]}")
+
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+def main(runs: int, top: int) -> None:
+    _import_times()
+    samples = [_import_times() for _ in range(runs)]
+
+    def median(name: str, index: int) -> float:
+        return statistics.median(s[name][index] for s in samples if name in s) / 1000
+
+    print(f"import {TARGET}: {median(TARGET, 1):.1f} ms (median of {runs} runs)\n")
+
+    print(f"Slowest {top} modules by cumulative time:")
+    modules = sorted(samples[0], key=lambda name: median(name, 1), reverse=True)
+    for name in modules[:top]:
+        print(f"  {median(name, 1):>9.1f} ms  {name}")
+
+    packages: dict[str, float] = defaultdict(float)
+    for name in samples[0]:
+        packages[name.split(".")[0]] += median(name, 0)
+    print(f"\nSelf time by top-level package (top {top}):")
+    for package, ms in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"  {ms:>9.1f} ms  {package}")
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 15,
+    )
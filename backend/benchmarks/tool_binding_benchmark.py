@@ -0,0 +1,73 @@
+"""Prompt-token savings from request-aware tool binding.
+
+For a fixed corpus of sample prompts, compares the tokens spent on tool
+schemas when every tool is bound (the previous behaviour) with the subset
+picked by `select_tools`. Schemas are serialised the way they are sent to
+the OpenAI-compatible API and counted with tiktoken (cl100k_base).
+
+Usage:
+    python -m benchmarks.tool_binding_benchmark
+"""
+import json
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from langchain_community.tools import DuckDuckGoSearchResults
+from src.modules.chat.context_builder import count_tokens
+from src.modules.chat.tools.google_calendar_tool import build_calendar_tools
+from src.modules.chat.tools.tool_selector import select_tools
+
+CORPUS = [
+    "hello",
+    "thanks!",
+    "Explain the difference between a process and a thread.",
+    "Write a haiku about autumn.",
+    "What is 17% of 2,340?",
+    "Summarise the plot of Hamlet in three sentences.",
+    "What's the latest news about the EU AI Act?",
+    "What is the current price of bitcoin?",
+    "Who won the Champions League final in 2025?",
+    "Search for a good ramen place in Kraków.",
+    "Schedule a meeting with Anna tomorrow at 3pm.",
+    "What's on my calendar next week?",
+    "Move my dentist appointment to Friday.",
+    "Delete the event called standup on Monday.",
+    "Umów spotkanie z zespołem w czwartek o 10:00.",
+    "Jaka jest dziś pogoda w Warszawie?",
+    "Find a free slot on Thursday and book a call about the latest release.",
+    "Refactor this Python function to use a list comprehension.",
+    "ok",
+    "Translate 'good morning' into Spanish and German.",
+]
+
+FAKE_CREDENTIALS = {
+    "token": "x",
+    "refresh_token": "x",
+    "client_id": "x",
+    "client_secret": "x",
+}
+
+def schema_tokens(tools) -> int:
+    return sum(count_tokens(json.dumps(convert_to_openai_tool(tool))) for tool in tools)
+
+def main() -> None:
+    groups = {
+        "web_search": [DuckDuckGoSearchResults(output_format="list", max_results=5)],
+        "calendar": build_calendar_tools(FAKE_CREDENTIALS),
+    }
+    all_tools = [tool for tools in groups.values() for tool in tools]
+    baseline = schema_tokens(all_tools)
+
+    total_before = total_after = 0
+    print(f"{'tokens':>6}  {'tools':>5}  prompt")
+    for prompt in CORPUS:
+        selected = select_tools([{"role": "user", "content": prompt}], groups)
+        tokens = schema_tokens(selected.values())
+        total_before += baseline
+        total_after += tokens
+        print(f"{tokens:>6}  {len(selected):>5}  {prompt}")
+
+    saved = total_before - total_after
+    print(f"\nAll tools bound: {baseline} schema tokens per call ({len(all_tools)} tools)")
+    print(f"Corpus total: {total_before} -> {total_after} tokens, saved {saved} ({saved / total_before:.0%})")
+
+if __name__ == "__main__":
+    main()
@@ -4,25 +4,100 @@ This module initializes the FastAPI application instance and registers
 the authentication routes used for user registration and related actions.
 It serves as the central setup point for the backend application.
 """
+import asyncio
+from contextlib import asynccontextmanager
+from pathlib import Path
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from src.modules.auth.auth_module import auth_module
 from src.modules.users.users_module import users_module
 from src.modules.chat.chat_module import chat_module
+from src.modules.chat.chat_controller import (
+    admission_rejected_handler,
+    idempotency_in_progress_handler,
+    idempotency_key_reused_handler,
+)
+from src.modules.upload.upload_module import upload_module
+from src.modules.metrics.metrics_module import metrics_module
+from src.modules.diagnostics.diagnostics_module import diagnostics_module
+from src.core import config, db
+from src.common.concurrency import AdmissionRejected
+from src.common.idempotency import IdempotencyInProgress, IdempotencyKeyReused
+from src.common.concurrency.thread_pool import shutdown_thread_pool
+from src.common.metrics import MetricsMiddleware
+from src.common.diagnostics import (
+    LoopWatchdog,
+    RequestTrackingMiddleware,
+    SlowRequestProfilerMiddleware,
+    profiler,
+    request_registry,
+)
+from src.common.tracing import JsonLogExporter, OtlpHttpExporter, TracingMiddleware, tracer
 
 origins = [
     "http://localhost:3000",
     "http://localhost:8080",
 ]
 
-app = FastAPI(title="Hierarchical AI assistants system")
+def _span_exporter():
+    if config.tracing_exporter == "log":
+        return JsonLogExporter()
+    if config.tracing_exporter == "otlp":
+        return OtlpHttpExporter(config.otlp_endpoint, service_name=config.tracing_service_name)
+    return None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    exporter = _span_exporter()
+    tracer.enabled = config.tracing_enabled
+    tracer.exporter = exporter
+    if isinstance(exporter, OtlpHttpExporter):
+        exporter.start()
+    request_registry.install(asyncio.get_running_loop())
+    watchdog = LoopWatchdog(
+        interval=config.loop_watchdog_interval,
+        threshold=config.loop_watchdog_threshold,
+    ) if config.loop_watchdog_enabled else None
+    if watchdog is not None:
+        watchdog.start()
+    profiler.interval = config.profiler_interval
+    profiler.slow_threshold = config.profile_slow_requests_over
+    profiler.output_dir = Path(config.profile_output_dir)
+    if config.profiler_enabled:
+        profiler.start()
+    await db.connect()
+    await chat_module.startup()
+    yield
+    await chat_module.shutdown()
+    await db.close()
+    if watchdog is not None:
+        await watchdog.stop()
+    if profiler.running:
+        await profiler.stop()
+    if isinstance(exporter, OtlpHttpExporter):
+        await exporter.stop()
+    shutdown_thread_pool()
+
+app = FastAPI(title="Hierarchical AI assistants system", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
+# Added last so they are outermost and see everything, CORS included
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware, server_timing=config.server_timing_enabled)
+app.add_middleware(SlowRequestProfilerMiddleware)
+app.add_middleware(RequestTrackingMiddleware)
+app.add_exception_handler(AdmissionRejected, admission_rejected_handler)
+app.add_exception_handler(IdempotencyInProgress, idempotency_in_progress_handler)
+app.add_exception_handler(IdempotencyKeyReused, idempotency_key_reused_handler)
 app.include_router(auth_module.router)
 app.include_router(users_module.router)
 app.include_router(chat_module.router)
+app.include_router(upload_module.router)
+app.include_router(metrics_module.router)
+app.include_router(diagnostics_module.router)
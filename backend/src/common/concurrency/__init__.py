@@ -0,0 +1,16 @@
+from .thread_pool import run_in_thread
+from .single_flight import SingleFlight
+from .stream_flight import StreamFlight
+from .circuit_breaker import CircuitBreaker
+from .admission import AdmissionController, AdmissionRejected, AdmissionTicket, Priority
+
+__all__ = [
+    "run_in_thread",
+    "SingleFlight",
+    "StreamFlight",
+    "CircuitBreaker",
+    "AdmissionController",
+    "AdmissionRejected",
+    "AdmissionTicket",
+    "Priority",
+]
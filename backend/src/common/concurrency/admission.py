@@ -0,0 +1,183 @@
+import time
+import heapq
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import AsyncIterator, Hashable
+from cachetools import TTLCache
+from src.common.tracing import span
+from src.common.metrics import ADMISSION_ACTIVE, ADMISSION_QUEUED, ADMISSION_REJECTED, ADMISSION_WAIT_SECONDS
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+class AdmissionRejected(Exception):
+    """A request was not admitted.
+
+    `reason` is "user_rate" when the user is over their rate, "queue_full" or
+    "queue_timeout" when the service is out of capacity; `retry_after` is
+    an estimate in seconds.
+    """
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Request not admitted: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take a token, returning 0, or return the seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def refund(self) -> None:
+        """Give back a token taken by a request that was not admitted after all."""
+        self.tokens = min(self.burst, self.tokens + 1)
+
+class AdmissionTicket:
+    def __init__(self, controller: "AdmissionController"):
+        self._controller = controller
+        self._admitted_at = time.monotonic()
+        self.released = False
+
+    def release(self) -> None:
+        """Return the slot. Safe to call more than once."""
+        if not self.released:
+            self.released = True
+            self._controller._release(time.monotonic() - self._admitted_at)
+
+class AdmissionController:
+    """Limit concurrent agent runs globally and the request rate per user.
+
+    A request first takes a token from its user's bucket, then a global slot.
+    When all slots are busy it waits in a bounded priority queue, interactive
+    requests ahead of background ones, for at most `queue_timeout` seconds.
+    Requests that cannot be admitted fail fast with `AdmissionRejected` and
+    a retry estimate instead of piling up upstream calls; when that is for
+    lack of capacity, the user's token is given back.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queue: int,
+        queue_timeout: float,
+        user_rate: float,
+        user_burst: int,
+        max_users: int = 10_000,
+    ):
+        if user_rate <= 0 or user_burst < 1:
+            raise ValueError("user_rate must be positive and user_burst at least 1")
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.active = 0
+        self._queue: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._buckets: TTLCache = TTLCache(maxsize=max_users, ttl=user_burst / user_rate * 2)
+        self._avg_hold = 1.0
+
+    def _reject(self, reason: str, retry_after: float) -> AdmissionRejected:
+        ADMISSION_REJECTED.labels(reason).inc()
+        return AdmissionRejected(reason, retry_after)
+
+    def _queue_delay(self) -> float:
+        return self._avg_hold * (len(self._queue) + 1) / self.max_concurrent
+
+    def _take_user_token(self, user_id: Hashable) -> TokenBucket:
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            bucket = TokenBucket(self.user_rate, self.user_burst)
+        # Re-inserting refreshes the TTL, so only idle users' buckets expire
+        self._buckets[user_id] = bucket
+        wait = bucket.take()
+        if wait:
+            raise self._reject("user_rate", wait)
+        return bucket
+
+    async def acquire(self, user_id: Hashable | None = None, priority: Priority = Priority.INTERACTIVE) -> AdmissionTicket:
+        """Wait for a slot and return a ticket that must be released.
+
+        Raises:
+            AdmissionRejected: If the user is over their rate, the queue is
+                full, or no slot freed up within `queue_timeout`.
+        """
+        bucket = self._take_user_token(user_id) if user_id is not None else None
+        try:
+            return await self._acquire_slot(Priority(priority))
+        except BaseException:
+            if bucket is not None:
+                bucket.refund()
+            raise
+
+    async def _acquire_slot(self, priority: Priority) -> AdmissionTicket:
+        label = priority.name.lower()
+        if self.active < self.max_concurrent and not self._queue:
+            self.active += 1
+            ADMISSION_ACTIVE.set(self.active)
+            ADMISSION_WAIT_SECONDS.labels(label).observe(0.0)
+            return AdmissionTicket(self)
+
+        if len(self._queue) >= self.max_queue:
+            raise self._reject("queue_full", self._queue_delay())
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._seq), future)
+        heapq.heappush(self._queue, entry)
+        queued = ADMISSION_QUEUED.labels(label)
+        queued.inc()
+        started = time.monotonic()
+        try:
+            with span("admission.wait", priority=label):
+                await asyncio.wait_for(asyncio.shield(future), timeout=self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as error:
+            queued.dec()
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                AdmissionTicket(self).release()
+            else:
+                future.cancel()
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+            if isinstance(error, asyncio.CancelledError):
+                raise
+            raise self._reject("queue_timeout", self._queue_delay())
+
+        queued.dec()
+        wait = time.monotonic() - started
+        ADMISSION_WAIT_SECONDS.labels(label).observe(wait)
+        return AdmissionTicket(self)
+
+    @asynccontextmanager
+    async def slot(self, user_id: Hashable | None = None, priority: Priority = Priority.INTERACTIVE) -> AsyncIterator[None]:
+        ticket = await self.acquire(user_id, priority)
+        try:
+            yield
+        finally:
+            ticket.release()
+
+    def _release(self, held: float) -> None:
+        self._avg_hold = 0.9 * self._avg_hold + 0.1 * held
+        while self._queue:
+            _, _, future = heapq.heappop(self._queue)
+            if not future.done():
+                # Hand the slot straight to the next waiter; `active` is unchanged
+                future.set_result(None)
+                return
+        self.active -= 1
+        ADMISSION_ACTIVE.set(self.active)
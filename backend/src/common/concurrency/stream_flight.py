@@ -0,0 +1,75 @@
+import asyncio
+from typing import AsyncIterator, Callable, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+class _Broadcast(Generic[T]):
+    def __init__(self):
+        self.items: list[T] = []
+        self.done = False
+        self.error: BaseException | None = None
+        self.subscribers = 0
+        self.task: asyncio.Task | None = None
+        self.changed = asyncio.Event()
+
+    def notify(self) -> None:
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+class StreamFlight:
+    """Share one upstream stream between concurrent subscribers with the same key.
+
+    The first subscriber for a key starts the producer; later subscribers
+    replay what has been produced so far and then follow it live, so every
+    subscriber sees the full stream. Errors are delivered to all of them.
+
+    By default the producer is cancelled if every subscriber leaves before it
+    finishes; with `cancel_when_idle=False` it runs to completion regardless,
+    so a subscriber can come back and pick it up again.
+    """
+
+    def __init__(self, cancel_when_idle: bool = True):
+        self.cancel_when_idle = cancel_when_idle
+        self._flights: dict[Hashable, _Broadcast] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._flights
+
+    async def subscribe(self, key: Hashable, factory: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        broadcast = self._flights.get(key)
+        if broadcast is None:
+            broadcast = self._flights[key] = _Broadcast()
+            broadcast.task = asyncio.create_task(self._produce(key, broadcast, factory))
+
+        broadcast.subscribers += 1
+        try:
+            index = 0
+            while True:
+                while index < len(broadcast.items):
+                    yield broadcast.items[index]
+                    index += 1
+                if broadcast.done:
+                    if broadcast.error is not None:
+                        raise broadcast.error
+                    return
+                await broadcast.changed.wait()
+        finally:
+            broadcast.subscribers -= 1
+            if self.cancel_when_idle and broadcast.subscribers == 0 and not broadcast.done:
+                broadcast.task.cancel()
+
+    async def _produce(self, key: Hashable, broadcast: _Broadcast, factory: Callable[[], AsyncIterator[T]]) -> None:
+        try:
+            async for item in factory():
+                broadcast.items.append(item)
+                broadcast.notify()
+        except asyncio.CancelledError:
+            # Only happens once nobody is subscribed, so there is no one to tell
+            pass
+        except Exception as error:
+            broadcast.error = error
+        finally:
+            broadcast.done = True
+            if self._flights.get(key) is broadcast:
+                del self._flights[key]
+            broadcast.notify()
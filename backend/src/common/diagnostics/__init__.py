@@ -0,0 +1,15 @@
+from .requests import ActiveRequest, RequestRegistry, RequestTrackingMiddleware, request_registry
+from .loop_watchdog import LoopWatchdog
+from .profiler import SamplingProfiler, SlowRequestProfilerMiddleware, format_collapsed, profiler
+
+__all__ = [
+    "ActiveRequest",
+    "RequestRegistry",
+    "RequestTrackingMiddleware",
+    "request_registry",
+    "LoopWatchdog",
+    "SamplingProfiler",
+    "SlowRequestProfilerMiddleware",
+    "format_collapsed",
+    "profiler",
+]
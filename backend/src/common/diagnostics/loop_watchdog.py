@@ -0,0 +1,98 @@
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from src.common.concurrency import run_in_thread
+from src.common.diagnostics.requests import RequestRegistry, request_registry
+from src.common.metrics import EVENT_LOOP_BLOCKS, EVENT_LOOP_LAG_SECONDS
+
+logger = logging.getLogger(__name__)
+
+class LoopWatchdog:
+    """Measure event-loop lag and report callbacks that block the loop.
+
+    A heartbeat task sleeps for `interval` and records how late it woke up.
+    A separate thread watches the heartbeat: once it is more than
+    `threshold` seconds overdue the loop is stuck in a callback, so the
+    thread grabs the loop thread's current stack and logs it together with
+    the route of the task being run. Each stall is reported once, while it
+    is still happening, so the stack points at the code that is blocking.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        threshold: float = 0.25,
+        max_frames: int = 30,
+        registry: RequestRegistry = request_registry,
+    ):
+        self.interval = interval
+        self.threshold = threshold
+        self.max_frames = max_frames
+        self.registry = registry
+        self._beat = time.monotonic()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._heartbeat_task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        """Start watching the running loop. Must be called from the loop thread."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopped.clear()
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+        if self._thread is not None:
+            await run_in_thread(self._thread.join)
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            EVENT_LOOP_LAG_SECONDS.observe(max(0.0, now - expected))
+            self._beat = now
+
+    def _watch(self) -> None:
+        reported = None
+        # Poll at half the interval so a stall is caught soon after it
+        # crosses the threshold
+        while not self._stopped.wait(self.interval / 2):
+            beat = self._beat
+            overdue = time.monotonic() - beat - self.interval
+            if overdue >= self.threshold and beat != reported:
+                reported = beat
+                self._report(overdue)
+
+    def _report(self, overdue: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame, limit=self.max_frames)) if frame else "  <no frame>\n"
+        task = asyncio.current_task(self._loop)
+        request = self.registry.for_task(task)
+        route = request.route if request is not None else "-"
+
+        EVENT_LOOP_BLOCKS.labels(route=route).inc()
+        logger.warning(
+            "Event loop blocked for %.0f ms so far (route=%s %s, chat_id=%s, task=%s)\n%s",
+            overdue * 1000,
+            request.method if request is not None else "-",
+            route,
+            request.chat_id if request is not None else "-",
+            task.get_name() if task is not None else "-",
+            stack.rstrip(),
+        )
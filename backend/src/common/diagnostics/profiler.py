@@ -0,0 +1,209 @@
+import re
+import sys
+import time
+import asyncio
+import logging
+import threading
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from starlette.types import ASGIApp, Receive, Scope, Send
+from src.common.concurrency import run_in_thread
+from src.common.diagnostics.requests import ActiveRequest, RequestRegistry, request_registry
+
+logger = logging.getLogger(__name__)
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})"
+
+def _thread_stack(frame: FrameType | None) -> list[str]:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+def _await_stack(coro) -> list[str]:
+    # Follow the chain of awaits down from a suspended task's coroutine
+    labels = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "ag_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        labels.append(_frame_label(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "ag_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return labels
+
+def request_label(request: ActiveRequest) -> str:
+    label = f"{request.method} {request.route}"
+    if request.chat_id is not None:
+        label += f" chat_id={request.chat_id}"
+    return label
+
+def format_collapsed(samples: Counter) -> str:
+    """Render samples in the collapsed-stack format read by flamegraph.pl and speedscope."""
+    return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+class SamplingProfiler:
+    """Sample the worker's stacks on a background thread.
+
+    Each tick records the stack of every thread plus the await chain of
+    every suspended task serving a request, so the profile shows wall time:
+    code running on the loop, code running in worker threads, and where
+    requests are waiting (LLM, Supabase, tools). Samples that belong to a
+    request are rooted at its method, route and chat id.
+
+    The thread only samples while there is a consumer: an on-demand
+    `capture`, or requests being tracked for the slow-request profile.
+    """
+
+    def __init__(self, interval: float = 0.01, registry: RequestRegistry = request_registry):
+        self.interval = interval
+        self.registry = registry
+        self.slow_threshold: float | None = None
+        self.output_dir = Path("profiles")
+        self._captures: list[Counter] = []
+        self._tracked: dict[int, Counter] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the sampling thread. Must be called from the loop thread."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            await run_in_thread(self._thread.join)
+            self._thread = None
+
+    async def capture(self, seconds: float) -> Counter:
+        """Sample the whole worker for `seconds` and return the collapsed stacks."""
+        samples = Counter()
+        with self._lock:
+            self._captures.append(samples)
+        self._wake.set()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            with self._lock:
+                self._captures.remove(samples)
+        return samples
+
+    def track(self, request: ActiveRequest) -> None:
+        with self._lock:
+            self._tracked[id(request)] = Counter()
+        self._wake.set()
+
+    def finish(self, request: ActiveRequest) -> Counter:
+        with self._lock:
+            return self._tracked.pop(id(request), Counter())
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            with self._lock:
+                idle = not self._captures and not self._tracked
+            if idle:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            started = time.monotonic()
+            self._sample()
+            self._stopped.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def _sample(self) -> None:
+        me = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        running = asyncio.current_task(self._loop)
+        samples: list[tuple[ActiveRequest | None, list[str]]] = []
+
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == me:
+                continue
+            if thread_id == self._loop_thread_id:
+                samples.append((self.registry.for_task(running), ["loop", *_thread_stack(frame)]))
+            else:
+                samples.append((None, [names.get(thread_id, str(thread_id)), *_thread_stack(frame)]))
+
+        for task, request in self.registry.snapshot():
+            if task is running or task.done():
+                continue
+            stack = _await_stack(task.get_coro())
+            if stack:
+                samples.append((request, ["await", *stack]))
+
+        with self._lock:
+            for request, stack in samples:
+                if request is not None:
+                    stack = [request_label(request), *stack]
+                collapsed = ";".join(stack)
+                for capture in self._captures:
+                    capture[collapsed] += 1
+                tracked = self._tracked.get(id(request)) if request is not None else None
+                if tracked is not None:
+                    tracked[collapsed] += 1
+
+    def write(self, request: ActiveRequest, samples: Counter, elapsed: float) -> Path:
+        """Write a request's samples to `output_dir`, named after its route and chat id."""
+        parts = [time.strftime("%Y%m%dT%H%M%S"), request.method.lower(), request.route]
+        if request.chat_id is not None:
+            parts.append(request.chat_id)
+        parts.append(f"{elapsed * 1000:.0f}ms")
+        name = "-".join(re.sub(r"[^A-Za-z0-9]+", "_", part).strip("_") or "root" for part in parts)
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / f"{name}.collapsed"
+        path.write_text(format_collapsed(samples))
+        return path
+
+profiler = SamplingProfiler()
+
+class SlowRequestProfilerMiddleware:
+    """Profile every request and keep the profile of those slower than the threshold.
+
+    Must sit inside `RequestTrackingMiddleware`, which binds the request
+    this middleware looks up. Paths under `exclude_prefixes` (the admin
+    capture endpoint, which is slow on purpose) are not profiled.
+    """
+
+    def __init__(self, app: ASGIApp, profiler: SamplingProfiler = profiler, exclude_prefixes: tuple[str, ...] = ("/admin/",)):
+        self.app = app
+        self.profiler = profiler
+        self.exclude_prefixes = exclude_prefixes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        request = self.profiler.registry.for_task(asyncio.current_task())
+        if (
+            scope["type"] != "http"
+            or request is None
+            or self.profiler.slow_threshold is None
+            or not self.profiler.running
+            or scope["path"].startswith(self.exclude_prefixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        self.profiler.track(request)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            samples = self.profiler.finish(request)
+            elapsed = time.monotonic() - request.started
+            if elapsed >= self.profiler.slow_threshold and samples:
+                path = await run_in_thread(self.profiler.write, request, samples, elapsed)
+                logger.warning("Slow request %s took %.0f ms; profile written to %s", request_label(request), elapsed * 1000, path)
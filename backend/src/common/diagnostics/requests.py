@@ -0,0 +1,93 @@
+import time
+import asyncio
+from dataclasses import dataclass, field
+from weakref import WeakKeyDictionary
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+@dataclass(slots=True)
+class ActiveRequest:
+    method: str
+    path: str
+    scope: Scope = field(repr=False)
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def route(self) -> str:
+        # The router fills in `route` and `path_params` on the shared scope
+        # once it has matched, so these are read lazily.
+        route = self.scope.get("route")
+        return getattr(route, "path", self.path)
+
+    @property
+    def chat_id(self) -> str | None:
+        return self.scope.get("path_params", {}).get("chat_id")
+
+class RequestRegistry:
+    """Map asyncio tasks to the HTTP request they are serving.
+
+    Diagnostics that run outside the request (a watchdog thread looking at
+    whatever task the loop is running) use this to name the route. Tasks
+    spawned while handling a request, such as the ones a streaming response
+    runs its body in, inherit the parent's request through the task factory
+    installed by `install`.
+    """
+
+    def __init__(self):
+        self._requests: WeakKeyDictionary[asyncio.Task, ActiveRequest] = WeakKeyDictionary()
+
+    def bind(self, task: asyncio.Task, request: ActiveRequest) -> None:
+        self._requests[task] = request
+
+    def unbind(self, task: asyncio.Task) -> None:
+        self._requests.pop(task, None)
+
+    def for_task(self, task: asyncio.Task | None) -> ActiveRequest | None:
+        if task is None:
+            return None
+        return self._requests.get(task)
+
+    def snapshot(self) -> list[tuple[asyncio.Task, ActiveRequest]]:
+        """Return the current bindings; safe to call from another thread."""
+        while True:
+            try:
+                return list(self._requests.items())
+            except RuntimeError:
+                # The loop thread added a task mid-copy; take it again
+                continue
+
+    def install(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Propagate request bindings to tasks created from a bound task."""
+        previous = loop.get_task_factory()
+
+        def factory(loop: asyncio.AbstractEventLoop, coro, **kwargs) -> asyncio.Task:
+            if previous is not None:
+                task = previous(loop, coro, **kwargs)
+            else:
+                task = asyncio.Task(coro, loop=loop, **kwargs)
+            request = self.for_task(asyncio.current_task(loop))
+            if request is not None:
+                self._requests[task] = request
+            return task
+
+        loop.set_task_factory(factory)
+
+request_registry = RequestRegistry()
+
+class RequestTrackingMiddleware:
+    """Register each HTTP request against the task that serves it."""
+
+    def __init__(self, app: ASGIApp, registry: RequestRegistry = request_registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        task = asyncio.current_task()
+        if scope["type"] != "http" or task is None:
+            await self.app(scope, receive, send)
+            return
+
+        self.registry.bind(task, ActiveRequest(method=scope["method"], path=scope["path"], scope=scope))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.registry.unbind(task)
@@ -0,0 +1,12 @@
+from .store import IdempotencyRecord, IdempotencyStore, InMemoryIdempotencyStore
+from .idempotency import Idempotency, IdempotencyInProgress, IdempotencyKeyReused, fingerprint
+
+__all__ = [
+    "Idempotency",
+    "IdempotencyInProgress",
+    "IdempotencyKeyReused",
+    "IdempotencyRecord",
+    "IdempotencyStore",
+    "InMemoryIdempotencyStore",
+    "fingerprint",
+]
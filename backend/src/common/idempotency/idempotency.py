@@ -0,0 +1,136 @@
+import asyncio
+import hashlib
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable
+from src.common.concurrency import SingleFlight, StreamFlight
+from src.common.idempotency.store import IdempotencyRecord, IdempotencyStore
+
+def fingerprint(*parts: Any) -> str:
+    """Hash the parts of a request that a retry must repeat exactly."""
+    return hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()
+
+class IdempotencyKeyReused(Exception):
+    """The key was already used for a request with a different fingerprint."""
+
+    def __init__(self):
+        super().__init__("Idempotency-Key was already used for a different request")
+
+class IdempotencyInProgress(Exception):
+    """The request for the key cannot be joined here; retry after `retry_after` seconds.
+
+    Raised while it runs in another process, and when the request it was
+    going to join failed before producing a response.
+    """
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+async def _replay(lines: list[str]) -> AsyncIterator[str]:
+    for line in lines:
+        yield line
+
+class Idempotency:
+    """Run each idempotency key at most once and hand retries the same result.
+
+    A retry of a completed request gets the stored response. A retry of a
+    request that is still running in this process joins it; a streamed
+    response is replayed from the start and then followed live. Work keeps
+    running if the original client disconnects, so a retry can pick it up.
+    A request still running in another process raises
+    `IdempotencyInProgress`, and reusing a key for a different request
+    raises `IdempotencyKeyReused`.
+    """
+
+    def __init__(self, store: IdempotencyStore):
+        self.store = store
+        self._calls = SingleFlight()
+        self._streams = StreamFlight(cancel_when_idle=False)
+        # Streams whose `start()` is still running, and started streams that
+        # no subscriber has picked up yet
+        self._starting: dict[str, asyncio.Future] = {}
+        self._started: dict[str, AsyncIterator[str]] = {}
+
+    def _check(self, record: IdempotencyRecord, fingerprint: str, running_here: bool) -> None:
+        if record.fingerprint != fingerprint:
+            raise IdempotencyKeyReused()
+        if record.status == "in_progress" and not running_here:
+            raise IdempotencyInProgress("A request with this Idempotency-Key is still in progress")
+
+    def _streaming_here(self, key: str) -> bool:
+        return key in self._starting or key in self._started or self._streams.in_flight(key)
+
+    async def run(self, key: str, fingerprint: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        record = await self.store.claim(key, fingerprint)
+        if record is not None:
+            self._check(record, fingerprint, self._calls.in_flight(key))
+            if record.status == "completed":
+                return record.response
+        return await self._calls.do(key, lambda: self._complete(key, func))
+
+    async def _complete(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            result = await func()
+        except BaseException:
+            await self.store.release(key)
+            raise
+        await self.store.complete(key, result)
+        return result
+
+    async def stream(
+        self,
+        key: str,
+        fingerprint: str,
+        start: Callable[[], Awaitable[AsyncIterator[str]]]
+    ) -> AsyncIterator[str]:
+        """Return the response stream for `key`, starting it with `start()` if it is new.
+
+        `start` does the request's up-front work and returns the stream, so
+        errors before the first line still surface as a normal HTTP error.
+        """
+        record = await self.store.claim(key, fingerprint)
+        if record is not None:
+            self._check(record, fingerprint, self._streaming_here(key))
+            if record.status == "completed":
+                return _replay(record.response)
+            starting = self._starting.get(key)
+            if starting is not None:
+                await asyncio.shield(starting)
+            return self._streams.subscribe(key, lambda: self._follow(key))
+
+        starting = self._starting[key] = asyncio.get_running_loop().create_future()
+        try:
+            self._started[key] = await start()
+        except BaseException:
+            await self.store.release(key)
+            raise
+        finally:
+            del self._starting[key]
+            starting.set_result(None)
+        return self._streams.subscribe(key, lambda: self._follow(key))
+
+    async def _follow(self, key: str) -> AsyncIterator[str]:
+        # Whichever subscriber iterates first produces the stream: from the
+        # started lines, or, if it already finished, from the stored record
+        lines = self._started.pop(key, None)
+        source = self._stored(key) if lines is None else self._record(key, lines)
+        async for line in source:
+            yield line
+
+    async def _stored(self, key: str) -> AsyncIterator[str]:
+        record = await self.store.get(key)
+        if record is None or record.status != "completed":
+            raise IdempotencyInProgress("The request with this Idempotency-Key failed; retry it")
+        for line in record.response:
+            yield line
+
+    async def _record(self, key: str, lines: AsyncIterator[str]) -> AsyncIterator[str]:
+        produced = []
+        try:
+            async for line in lines:
+                produced.append(line)
+                yield line
+        except BaseException:
+            await self.store.release(key)
+            raise
+        await self.store.complete(key, produced)
@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+from typing import Any, Literal, Protocol
+from cachetools import TTLCache
+
+@dataclass
+class IdempotencyRecord:
+    fingerprint: str
+    status: Literal["in_progress", "completed"] = "in_progress"
+    response: Any = None
+
+class IdempotencyStore(Protocol):
+    """Storage for idempotency keys.
+
+    `claim` must be atomic (an in-memory dict here; SET NX or an insert with
+    a unique constraint in a shared backend) so that two workers never both
+    start the same request. Shared backends also need to serialise
+    `response`, which is a JSON-compatible value or a list of NDJSON lines.
+    """
+
+    async def claim(self, key: str, fingerprint: str) -> IdempotencyRecord | None:
+        """Record `key` as in progress, or return its record if it already exists."""
+        ...
+
+    async def get(self, key: str) -> IdempotencyRecord | None:
+        ...
+
+    async def complete(self, key: str, response: Any) -> None:
+        ...
+
+    async def release(self, key: str) -> None:
+        """Forget a key whose request failed, so that a retry runs it again."""
+        ...
+
+class InMemoryIdempotencyStore:
+    """A per-process `IdempotencyStore`, bounded in size and evicted by TTL."""
+
+    def __init__(self, max_entries: int = 4096, ttl: int = 86400):
+        self._records: TTLCache = TTLCache(maxsize=max_entries, ttl=ttl)
+
+    async def claim(self, key: str, fingerprint: str) -> IdempotencyRecord | None:
+        record = self._records.get(key)
+        if record is None:
+            self._records[key] = IdempotencyRecord(fingerprint=fingerprint)
+        return record
+
+    async def get(self, key: str) -> IdempotencyRecord | None:
+        return self._records.get(key)
+
+    async def complete(self, key: str, response: Any) -> None:
+        record = self._records.get(key)
+        if record is not None:
+            record.status = "completed"
+            record.response = response
+            # Re-insert so the TTL runs from completion, not from the claim
+            self._records[key] = record
+
+    async def release(self, key: str) -> None:
+        self._records.pop(key, None)
@@ -0,0 +1,43 @@
+from .collectors import (
+    HTTP_REQUEST_SECONDS,
+    LLM_TIME_TO_FIRST_TOKEN_SECONDS,
+    LLM_REQUEST_SECONDS,
+    LLM_TOKENS,
+    TOOL_SECONDS,
+    DB_QUERY_SECONDS,
+    ERRORS,
+    ROUTER_DECISIONS,
+    COALESCED_REQUESTS,
+    ADMISSION_ACTIVE,
+    ADMISSION_QUEUED,
+    ADMISSION_WAIT_SECONDS,
+    ADMISSION_REJECTED,
+    WRITE_BEHIND_DROPPED,
+    EVENT_LOOP_LAG_SECONDS,
+    EVENT_LOOP_BLOCKS,
+)
+from .cache_stats import cache_stats
+from .middleware import MetricsMiddleware
+from .httpx_hooks import supabase_event_hooks
+
+__all__ = [
+    "HTTP_REQUEST_SECONDS",
+    "LLM_TIME_TO_FIRST_TOKEN_SECONDS",
+    "LLM_REQUEST_SECONDS",
+    "LLM_TOKENS",
+    "TOOL_SECONDS",
+    "DB_QUERY_SECONDS",
+    "ERRORS",
+    "ROUTER_DECISIONS",
+    "COALESCED_REQUESTS",
+    "ADMISSION_ACTIVE",
+    "ADMISSION_QUEUED",
+    "ADMISSION_WAIT_SECONDS",
+    "ADMISSION_REJECTED",
+    "WRITE_BEHIND_DROPPED",
+    "EVENT_LOOP_LAG_SECONDS",
+    "EVENT_LOOP_BLOCKS",
+    "cache_stats",
+    "MetricsMiddleware",
+    "supabase_event_hooks",
+]
@@ -0,0 +1,32 @@
+from typing import Callable, Iterator
+from prometheus_client.core import CounterMetricFamily
+from prometheus_client.registry import Collector, REGISTRY
+
+class CacheStatsCollector(Collector):
+    """Export the hit/miss counters that caches already keep, at scrape time.
+
+    Reading existing counters when Prometheus scrapes adds nothing to the
+    cache hot paths.
+    """
+
+    def __init__(self):
+        self._caches: dict[str, tuple[Callable[[], dict], dict[str, str]]] = {}
+
+    def register(self, name: str, stats: Callable[[], dict], results: dict[str, str]) -> None:
+        """Export `stats()[key]` as cache_requests_total{cache=name, result=label}.
+
+        Args:
+            results: Maps a result label (e.g. "hit") to its key in `stats()`.
+        """
+        self._caches[name] = (stats, results)
+
+    def collect(self) -> Iterator[CounterMetricFamily]:
+        family = CounterMetricFamily("cache_requests", "Cache lookups by cache and result", labels=["cache", "result"])
+        for name, (stats, results) in self._caches.items():
+            values = stats()
+            for label, key in results.items():
+                family.add_metric([name, label], values.get(key, 0))
+        yield family
+
+cache_stats = CacheStatsCollector()
+REGISTRY.register(cache_stats)
@@ -0,0 +1,110 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+# Latency buckets are in seconds; LLM calls need a much longer tail than HTTP
+# handlers or database queries.
+DB_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+HTTP_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 32, 64, 128)
+TOOL_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 32)
+TOKEN_BUCKETS = (16, 64, 256, 1024, 2048, 4096, 8192, 16384, 32768, 65536)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time from request start until the response body is fully sent",
+    ["method", "route", "status"],
+    buckets=HTTP_BUCKETS,
+)
+
+LLM_TIME_TO_FIRST_TOKEN_SECONDS = Histogram(
+    "llm_time_to_first_token_seconds",
+    "Time from an LLM call until its first streamed token",
+    ["model"],
+    buckets=LLM_BUCKETS,
+)
+
+LLM_REQUEST_SECONDS = Histogram(
+    "llm_request_duration_seconds",
+    "Total duration of an LLM call",
+    ["model", "outcome"],
+    buckets=LLM_BUCKETS,
+)
+
+LLM_TOKENS = Histogram(
+    "llm_tokens",
+    "Tokens per LLM call",
+    ["model", "kind"],
+    buckets=TOKEN_BUCKETS,
+)
+
+TOOL_SECONDS = Histogram(
+    "tool_duration_seconds",
+    "Duration of an agent tool call",
+    ["tool", "outcome"],
+    buckets=TOOL_BUCKETS,
+)
+
+DB_QUERY_SECONDS = Histogram(
+    "supabase_request_duration_seconds",
+    "Time until Supabase responds to a request, by table and operation",
+    ["table", "operation"],
+    buckets=DB_BUCKETS,
+)
+
+ERRORS = Counter(
+    "errors",
+    "Errors by component and kind",
+    ["component", "kind"],
+)
+
+ROUTER_DECISIONS = Counter(
+    "llm_router_decisions",
+    "Model routing decisions",
+    ["tier", "reason", "model"],
+)
+
+COALESCED_REQUESTS = Counter(
+    "agent_coalesced_requests",
+    "Agent requests that joined an identical in-flight run",
+)
+
+ADMISSION_ACTIVE = Gauge(
+    "admission_active_slots",
+    "Agent runs currently holding an admission slot",
+)
+
+ADMISSION_QUEUED = Gauge(
+    "admission_queue_depth",
+    "Requests waiting for an admission slot",
+    ["priority"],
+)
+
+ADMISSION_WAIT_SECONDS = Histogram(
+    "admission_wait_seconds",
+    "Time spent waiting for an admission slot",
+    ["priority"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10),
+)
+
+ADMISSION_REJECTED = Counter(
+    "admission_rejected",
+    "Requests rejected by admission control",
+    ["reason"],
+)
+
+WRITE_BEHIND_DROPPED = Counter(
+    "message_write_behind_dropped",
+    "Buffered messages dropped because the database rejected them or shutdown timed out",
+    ["reason"],
+)
+
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop heartbeat woke up",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+EVENT_LOOP_BLOCKS = Counter(
+    "event_loop_blocks",
+    "Times the event loop was blocked longer than the watchdog threshold",
+    ["route"],
+)
@@ -0,0 +1,40 @@
+import time
+import httpx
+from src.common.metrics.collectors import DB_QUERY_SECONDS, ERRORS
+
+_OPERATIONS = {"GET": "select", "HEAD": "select", "POST": "insert", "PATCH": "update", "PUT": "upsert", "DELETE": "delete"}
+
+def _label(request: httpx.Request) -> tuple[str, str]:
+    # PostgREST: /rest/v1/<table>; auth: /auth/v1/<endpoint>; storage and
+    # anything else is labelled by its service.
+    parts = request.url.path.strip("/").split("/")
+    service = parts[0] if parts else ""
+    resource = parts[2] if len(parts) > 2 else ""
+    if service == "rest":
+        operation = _OPERATIONS.get(request.method, request.method.lower())
+        if operation == "insert" and "resolution=" in request.headers.get("prefer", ""):
+            operation = "upsert"
+        return resource, operation
+    if service == "auth":
+        return "auth", resource
+    return service, request.method.lower()
+
+async def _on_request(request: httpx.Request) -> None:
+    request.extensions["metrics_started"] = time.perf_counter()
+
+async def _on_response(response: httpx.Response) -> None:
+    started = response.request.extensions.get("metrics_started")
+    if started is None:
+        return
+    table, operation = _label(response.request)
+    DB_QUERY_SECONDS.labels(table, operation).observe(time.perf_counter() - started)
+    if response.status_code >= 500:
+        ERRORS.labels("supabase", str(response.status_code)).inc()
+
+def supabase_event_hooks() -> dict:
+    """httpx event hooks that time Supabase requests by table and operation.
+
+    The response hook runs once headers arrive, so this measures time to
+    first byte; bodies are small enough that it tracks the full query time.
+    """
+    return {"request": [_on_request], "response": [_on_response]}
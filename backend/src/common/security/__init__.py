@@ -1,3 +1,4 @@
 from .is_token_valid import is_token_valid
+from .token_verifier import TokenVerifier, MissingSigningKeyError
 
-__all__ = ["is_token_valid"]
\ No newline at end of file
+__all__ = ["is_token_valid", "TokenVerifier", "MissingSigningKeyError"]
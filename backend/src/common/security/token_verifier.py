@@ -0,0 +1,143 @@
+import time
+import hashlib
+import threading
+import jwt
+from cachetools import TLRUCache
+from jwt.exceptions import InvalidAlgorithmError, InvalidTokenError, PyJWKClientError
+from src.common.concurrency import run_in_thread
+
+class MissingSigningKeyError(InvalidTokenError):
+    """Raised when a token cannot be verified locally with the configured keys."""
+
+class TokenVerifier:
+    """Verify access tokens locally and cache the resulting claims.
+
+    HS* tokens are checked against the shared JWT secret, asymmetric tokens
+    against the project's JWKS (cached for `jwks_ttl`).
+    Only algorithms in `algorithms` are accepted, whatever the token header
+    claims. An unknown `kid` triggers at most one JWKS refetch per
+    `jwks_refetch_interval`, so forged tokens cannot hammer the endpoint.
+    Verified claims live in a TTL-bounded LRU keyed by a SHA-256 of the token,
+    so repeated requests with the same token skip signature checks entirely.
+    """
+
+    def __init__(
+        self,
+        secret: str | None,
+        audience: str,
+        jwks_url: str | None = None,
+        cache_size: int = 10_000,
+        cache_ttl: int = 300,
+        jwks_ttl: int = 3600,
+        jwks_refetch_interval: float = 60.0,
+        algorithms: tuple[str, ...] = ("HS256", "RS256", "ES256"),
+    ):
+        self.secret = secret
+        self.audience = audience
+        self.cache_ttl = cache_ttl
+        self.algorithms = tuple(algorithms)
+        self.jwks_refetch_interval = jwks_refetch_interval
+        self.jwks_ttl = jwks_ttl
+        self._jwks = jwt.PyJWKClient(jwks_url, cache_jwk_set=False) if jwks_url else None
+        self._jwks_keys: dict[str, object] = {}
+        self._jwks_fetched_at = float("-inf")
+        self._jwks_lock = threading.Lock()
+        # Entries expire at whichever comes first: the cache TTL or the token's exp
+        self._claims = TLRUCache(maxsize=cache_size, ttu=self._expires_at, timer=time.time)
+        self._revoked = TLRUCache(maxsize=cache_size, ttu=self._expires_at, timer=time.time)
+
+    def _expires_at(self, _key: str, claims: dict, now: float) -> float:
+        return min(now + self.cache_ttl, claims.get("exp", now))
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def _signing_key(self, token: str, algorithm: str):
+        if algorithm.startswith("HS"):
+            if not self.secret:
+                raise MissingSigningKeyError("JWT secret is not configured")
+            return self.secret
+        if self._jwks is None:
+            raise MissingSigningKeyError("JWKS endpoint is not configured")
+        return self._jwks_key(jwt.get_unverified_header(token).get("kid"))
+
+    def _jwks_key(self, kid: str | None):
+        if not kid:
+            raise InvalidTokenError("Token has no key id")
+        with self._jwks_lock:
+            now = time.monotonic()
+            fresh = now - self._jwks_fetched_at < self.jwks_ttl
+            if kid in self._jwks_keys and fresh:
+                return self._jwks_keys[kid]
+            # Keys may have been rotated, but neither a forged kid nor an
+            # unreachable endpoint may turn every request into a fetch
+            if now - self._jwks_fetched_at < self.jwks_refetch_interval:
+                raise PyJWKClientError(f'Unknown signing key "{kid}"')
+            self._jwks_fetched_at = now
+            self._jwks_keys = {key.key_id: key.key for key in self._jwks.get_signing_keys(refresh=True)}
+            if kid not in self._jwks_keys:
+                raise PyJWKClientError(f'Unknown signing key "{kid}"')
+            return self._jwks_keys[kid]
+
+    def _cached(self, token: str) -> dict | None:
+        key = self._key(token)
+        if key in self._revoked:
+            raise InvalidTokenError("Token has been revoked")
+        return self._claims.get(key)
+
+    def verify(self, token: str) -> dict:
+        """Return the token's claims, verifying it only on a cache miss.
+
+        Raises:
+            PyJWTError: If the token is malformed, expired, revoked, uses a
+                disallowed algorithm or is signed with an unknown key, or
+                the JWKS cannot be fetched.
+        """
+        claims = self._cached(token)
+        if claims is not None:
+            return claims
+
+        algorithm = jwt.get_unverified_header(token).get("alg", "")
+        if algorithm not in self.algorithms:
+            raise InvalidAlgorithmError(f"Algorithm {algorithm!r} is not allowed")
+        claims = jwt.decode(
+            token,
+            self._signing_key(token, algorithm),
+            algorithms=list(self.algorithms),
+            audience=self.audience,
+            options={"require": ["exp", "sub"]},
+        )
+        self._claims[self._key(token)] = claims
+        return claims
+
+    async def averify(self, token: str) -> dict:
+        """Like `verify`, but runs a verification that may fetch the JWKS off the loop."""
+        claims = self._cached(token)
+        if claims is not None:
+            return claims
+        algorithm = jwt.get_unverified_header(token).get("alg", "")
+        if algorithm.startswith("HS"):
+            return self.verify(token)
+        return await run_in_thread(self.verify, token)
+
+    @staticmethod
+    def _unverified_exp(token: str) -> float | None:
+        try:
+            return jwt.decode(token, options={"verify_signature": False}).get("exp")
+        except InvalidTokenError:
+            return None
+
+    def remember(self, token: str, claims: dict) -> None:
+        """Cache claims that were verified by some other means (e.g. the auth server)."""
+        exp = claims.get("exp") or self._unverified_exp(token)
+        if exp is not None:
+            self._claims[self._key(token)] = {**claims, "exp": exp}
+
+    def revoke(self, token: str) -> None:
+        """Drop a token from the cache and reject it until it expires."""
+        key = self._key(token)
+        self._claims.pop(key, None)
+        exp = self._unverified_exp(token)
+        if exp is not None:
+            self._revoked[key] = {"exp": exp}
@@ -0,0 +1,16 @@
+from .tracer import Span, SpanExporter, Tracer, current_span, span, traced, tracer
+from .exporters import JsonLogExporter, OtlpHttpExporter
+from .middleware import TracingMiddleware
+
+__all__ = [
+    "Span",
+    "SpanExporter",
+    "Tracer",
+    "current_span",
+    "span",
+    "traced",
+    "tracer",
+    "JsonLogExporter",
+    "OtlpHttpExporter",
+    "TracingMiddleware",
+]
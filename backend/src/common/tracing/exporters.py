@@ -0,0 +1,126 @@
+import json
+import asyncio
+import logging
+import httpx
+from src.common.tracing.tracer import Span
+
+logger = logging.getLogger(__name__)
+
+def _span_dict(span: Span) -> dict:
+    return {
+        "name": span.name,
+        "trace_id": span.trace_id,
+        "span_id": span.span_id,
+        "parent_id": span.parent_id,
+        "start_ns": span.start_ns,
+        "duration_ms": round(span.duration_ms, 3),
+        "status": span.status,
+        "attributes": span.attributes,
+    }
+
+class JsonLogExporter:
+    """Log each finished span as one JSON line."""
+
+    def __init__(self, logger_name: str = "tracing"):
+        self._logger = logging.getLogger(logger_name)
+
+    def export(self, span: Span) -> None:
+        self._logger.info(json.dumps(_span_dict(span), default=str))
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def _otlp_span(span: Span) -> dict:
+    otlp = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 2 if span.parent_id is None else 1,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in span.attributes.items()],
+        "status": {"code": 2 if span.status == "error" else 1},
+    }
+    if span.parent_id:
+        otlp["parentSpanId"] = span.parent_id
+    return otlp
+
+class OtlpHttpExporter:
+    """Send spans to an OTLP/HTTP collector as JSON, in batches.
+
+    Spans are queued in memory and flushed by a background task every
+    `flush_interval` seconds or once `batch_size` are waiting. If the
+    collector falls behind, spans beyond `max_queue` are dropped rather
+    than held.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        service_name: str,
+        batch_size: int = 512,
+        flush_interval: float = 1.0,
+        max_queue: int = 8192,
+    ):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.dropped = 0
+        self._queue: list[Span] = []
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._http: httpx.AsyncClient | None = None
+
+    def export(self, span: Span) -> None:
+        if len(self._queue) >= self.max_queue:
+            self.dropped += 1
+            return
+        self._queue.append(span)
+        if len(self._queue) >= self.batch_size:
+            self._wake.set()
+
+    def start(self) -> None:
+        self._http = httpx.AsyncClient(timeout=5.0)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        await self._flush()
+        if self._http is not None:
+            await self._http.aclose()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self._flush()
+
+    async def _flush(self) -> None:
+        while self._queue and self._http is not None:
+            batch, self._queue = self._queue[:self.batch_size], self._queue[self.batch_size:]
+            payload = {
+                "resourceSpans": [{
+                    "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                    "scopeSpans": [{"scope": {"name": "src.common.tracing"}, "spans": [_otlp_span(span) for span in batch]}],
+                }]
+            }
+            try:
+                response = await self._http.post(self.url, json=payload)
+                response.raise_for_status()
+            except httpx.HTTPError as error:
+                self.dropped += len(batch)
+                logger.warning("Could not export %d spans to %s: %r", len(batch), self.url, error)
+                return
@@ -0,0 +1,53 @@
+import re
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.common.tracing.tracer import ServerTimings, _current_timings, tracer
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+def _remote_parent(scope: Scope) -> tuple[str | None, str | None]:
+    for name, value in scope["headers"]:
+        if name == b"traceparent":
+            match = _TRACEPARENT.match(value.decode("latin-1").strip())
+            if match:
+                return match.group(1), match.group(2)
+    return None, None
+
+class TracingMiddleware:
+    """Open a root span per HTTP request and report it in a Server-Timing header.
+
+    An incoming W3C `traceparent` header continues the caller's trace. The
+    header is built when the response starts, so for streaming responses it
+    covers the work done before the first chunk (auth, history, inserts) but
+    not the model output that follows.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = True):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        trace_id, parent_id = _remote_parent(scope)
+        timings = ServerTimings()
+        timings_token = _current_timings.set(timings)
+        started = time.perf_counter()
+
+        try:
+            with tracer.span("http.request", trace_id=trace_id, parent_id=parent_id, method=scope["method"], path=scope["path"]) as root:
+                async def send_wrapper(message: Message) -> None:
+                    if message["type"] == "http.response.start":
+                        route = scope.get("route")
+                        root.attributes["route"] = getattr(route, "path", "unmatched")
+                        root.attributes["status"] = message["status"]
+                        if self.server_timing:
+                            header = timings.header((time.perf_counter() - started) * 1000, root.trace_id)
+                            message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header.encode())]}
+                    await send(message)
+
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_timings.reset(timings_token)
@@ -0,0 +1,149 @@
+import time
+import random
+import asyncio
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Protocol
+
+@dataclass(slots=True)
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start_ns: int
+    end_ns: int = 0
+    attributes: dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+class SpanExporter(Protocol):
+    def export(self, span: Span) -> None:
+        """Accept a finished span. Must not block; batching happens elsewhere."""
+        ...
+
+class ServerTimings:
+    """Per-request span time, grouped by the first segment of the span name.
+
+    A category's duration is the wall time covered by its spans, so spans
+    that overlap (concurrent queries, or a `service.*` span nested in
+    another) are not counted twice.
+    """
+
+    def __init__(self):
+        self.intervals: dict[str, list[tuple[int, int]]] = {}
+
+    def add(self, span: Span) -> None:
+        category = span.name.partition(".")[0]
+        self.intervals.setdefault(category, []).append((span.start_ns, span.end_ns))
+
+    @staticmethod
+    def _covered_ms(intervals: list[tuple[int, int]]) -> float:
+        covered, end = 0, None
+        for start, stop in sorted(intervals):
+            if end is None or start > end:
+                covered += stop - start
+                end = stop
+            elif stop > end:
+                covered += stop - end
+                end = stop
+        return covered / 1e6
+
+    def header(self, elapsed_ms: float, trace_id: str) -> str:
+        entries = [
+            f"{category};dur={self._covered_ms(intervals):.1f}"
+            + (f';desc="{len(intervals)} spans"' if len(intervals) > 1 else "")
+            for category, intervals in self.intervals.items()
+        ]
+        entries.append(f"app;dur={elapsed_ms:.1f}")
+        entries.append(f'trace;desc="{trace_id}"')
+        return ", ".join(entries)
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+_current_timings: ContextVar[ServerTimings | None] = ContextVar("current_timings", default=None)
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+class Tracer:
+    """Nested spans carried in a context variable.
+
+    A span's parent is whatever span is current when it starts, so spans
+    follow awaits and tasks (which copy the context) without being passed
+    around. Finished spans go to the exporter, if any, and to the current
+    request's Server-Timing entries.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.exporter: SpanExporter | None = None
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        trace_id: str | None = None,
+        parent_id: str | None = None,
+        **attributes: Any
+    ) -> Iterator[Span | None]:
+        if not self.enabled:
+            yield None
+            return
+
+        parent = _current_span.get()
+        if parent is not None and trace_id is None:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        span = Span(
+            name=name,
+            trace_id=trace_id or f"{random.getrandbits(128):032x}",
+            span_id=f"{random.getrandbits(64):016x}",
+            parent_id=parent_id,
+            start_ns=time.time_ns(),
+            attributes=attributes,
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except (asyncio.CancelledError, GeneratorExit):
+            span.status = "cancelled"
+            raise
+        except BaseException as error:
+            span.status = "error"
+            span.attributes["error.type"] = type(error).__name__
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # An async generator closed from another context
+                pass
+            self._finish(span)
+
+    def _finish(self, span: Span) -> None:
+        timings = _current_timings.get()
+        if timings is not None:
+            timings.add(span)
+        if self.exporter is not None:
+            self.exporter.export(span)
+
+    def traced(self, name: str | None = None) -> Callable:
+        """Decorate a coroutine function to run inside a span."""
+        def decorator(func: Callable) -> Callable:
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self.span(span_name):
+                    return await func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+tracer = Tracer()
+span = tracer.span
+traced = tracer.traced
@@ -1,4 +1,4 @@
 from .config import config
-from .db import supabase
+from .db import db
 
-__all__ = ["config", "supabase"]
+__all__ = ["config", "db"]
@@ -1,5 +1,11 @@
+from pydantic import BaseModel, PositiveFloat, PositiveInt
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+class LLMProvider(BaseModel):
+    """An extra OpenAI-compatible endpoint, referenced from model lists as `model@name`."""
+    base_url: str
+    api_key: str
+
 class Config(BaseSettings):
     host: str
     port: int
@@ -13,8 +19,80 @@ class Config(BaseSettings):
     openrouter_url: str
     max_chat_history: int
     stream_timeout: int
+    max_prompt_tokens: int = 8000
+    title_model: str = "mistralai/devstral-2512:free"
+    summary_model: str = "mistralai/devstral-2512:free"
+    summary_keep_recent: int = 10
+    summary_refresh_interval: int = 10
+    history_cache_size: int = 1024
+    history_cache_ttl: int = 300
+    response_cache_enabled: bool = False
+    response_cache_size: int = 2048
+    response_cache_ttl: int = 3600
+    response_cache_similarity: float | None = None
+    web_search_cache_ttl: int = 600
+    web_search_cache_max_bytes: int = 4_000_000
+    calendar_pool_size: int = 256
+    calendar_pool_ttl: int = 1800
+    calendar_pool_failure_ttl: int = 30
+    google_credentials_cache_ttl: int = 60
+    tool_selection_enabled: bool = True
+    tool_selection_fallback: list[str] = ["web_search"]
+    message_write_behind: bool = False
+    message_flush_batch_size: int = 50
+    message_flush_interval_ms: int = 200
+    message_flush_max_backoff: float = 30.0
+    fast_models: list[str] = ["mistralai/devstral-2512:free"]
+    strong_models: list[str] = ["mistralai/devstral-2512:free"]
+    router_fast_max_prompt_tokens: int = 1500
+    router_fast_max_message_chars: int = 400
+    router_fast_max_tools: int = 1
+    llm_providers: dict[str, LLMProvider] = {}
+    llm_request_timeout: float = 120.0
+    llm_hedge_delay: float | None = 4.0
+    llm_breaker_failure_threshold: int = 3
+    llm_breaker_reset_timeout: float = 30.0
+    admission_max_concurrent: int = 32
+    admission_max_queue: int = 64
+    admission_queue_timeout: float = 5.0
+    user_rate_per_minute: PositiveFloat = 20.0
+    user_burst: PositiveInt = 10
+    idempotency_cache_size: int = 4096
+    idempotency_ttl: int = 86400
+    tracing_enabled: bool = True
+    tracing_exporter: str | None = None
+    otlp_endpoint: str = "http://localhost:4318"
+    tracing_service_name: str = "hierarchical-ai-assistants-backend"
+    server_timing_enabled: bool = True
+    loop_watchdog_enabled: bool = False
+    loop_watchdog_interval: float = 0.1
+    loop_watchdog_threshold: float = 0.25
+    profiler_enabled: bool = False
+    profiler_interval: float = 0.01
+    profiler_max_seconds: float = 60.0
+    profile_slow_requests_over: float | None = None
+    profile_output_dir: str = "profiles"
+    admin_token: str | None = None
+    supervisor_enabled: bool = False
+    supervisor_deadline: float = 45.0
+    supervisor_max_subtasks: int = 4
+    planner_model: str = "mistralai/devstral-2512:free"
+    search_agent_model: str = "mistralai/devstral-2512:free"
+    calendar_agent_model: str = "mistralai/devstral-2512:free"
+    reasoning_agent_model: str = "mistralai/devstral-2512:free"
     title_generation_prompt: str
     encrypt_key: str
+    blocking_pool_size: int = 16
+    db_max_connections: int = 100
+    db_max_keepalive_connections: int = 20
+    db_keepalive_expiry: float = 30.0
+    db_timeout: float = 10.0
+    supabase_jwt_secret: str | None = None
+    supabase_jwt_audience: str = "authenticated"
+    supabase_jwt_algorithms: list[str] = ["HS256", "RS256", "ES256"]
+    auth_cache_size: int = 10000
+    auth_cache_ttl: int = 300
+    auth_jwks_refetch_interval: float = 60.0
 
     model_config = SettingsConfigDict(env_file=".env")
 
@@ -1,4 +1,56 @@
-from supabase import create_client, Client
-from src.core import config
+import httpx
+from supabase import AsyncClient, AsyncClientOptions, acreate_client
+from src.core.config import config
+from src.common.metrics import supabase_event_hooks
 
-supabase: Client = create_client(config.supabase_url, config.supabase_key)
+class Database:
+    """Owns the async Supabase client and the HTTP connection pool behind it.
+
+    Every Supabase sub-client (PostgREST, auth, storage) shares a single
+    keep-alive `httpx.AsyncClient`, so requests reuse warm connections
+    instead of paying a TLS handshake each time.
+    """
+
+    def __init__(self):
+        self._client: AsyncClient | None = None
+        self._http: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> AsyncClient:
+        if self._client is None:
+            raise RuntimeError("Database is not connected; call `await db.connect()` at startup")
+        return self._client
+
+    async def connect(self) -> None:
+        if self._client is not None:
+            return
+
+        try:
+            import h2  # noqa: F401
+            http2 = True
+        except ImportError:
+            http2 = False
+
+        self._http = httpx.AsyncClient(
+            http2=http2,
+            timeout=httpx.Timeout(config.db_timeout),
+            limits=httpx.Limits(
+                max_connections=config.db_max_connections,
+                max_keepalive_connections=config.db_max_keepalive_connections,
+                keepalive_expiry=config.db_keepalive_expiry,
+            ),
+            event_hooks=supabase_event_hooks(),
+        )
+        self._client = await acreate_client(
+            config.supabase_url,
+            config.supabase_key,
+            options=AsyncClientOptions(httpx_client=self._http),
+        )
+
+    async def close(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+        self._client = None
+        self._http = None
+
+db = Database()
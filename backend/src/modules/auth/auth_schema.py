@@ -1,5 +1,5 @@
 import re
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel, EmailStr, Field, field_validator, ValidationInfo
 
 class SignUpSchema(BaseModel):
@@ -124,3 +124,19 @@ class AmrItem(BaseModel):
 class GetClaimsResponseSchema(BaseModel):
     aal: str
     amr: List[AmrItem]
+
+class AuthenticatedUser(BaseModel):
+    """Principal resolved from a verified access token."""
+    id: str
+    email: Optional[str] = None
+    role: Optional[str] = None
+    claims: dict = Field(default_factory=dict)
+
+    @classmethod
+    def from_claims(cls, claims: dict) -> "AuthenticatedUser":
+        return cls(
+            id=claims["sub"],
+            email=claims.get("email"),
+            role=claims.get("role"),
+            claims=claims
+        )
@@ -11,8 +11,9 @@ from src.modules.auth.auth_schema import (
     SignOutResponseSchema,
     GetClaimsResponseSchema
 )
-from src.core import supabase, config
+from src.core import db, config
 from src.common.security import is_token_valid
+from src.modules.auth.dependencies import token_verifier
 
 
 class AuthService:
@@ -26,7 +27,7 @@ class AuthService:
                 repeat_password=repeat_password,
             )
 
-            response = supabase.auth.sign_up(
+            response = await db.client.auth.sign_up(
                 {
                     "email": form.email,
                     "password": form.password,
@@ -73,7 +74,7 @@ class AuthService:
                 password=password,
             )
 
-            res = supabase.auth.sign_in_with_password(
+            res = await db.client.auth.sign_in_with_password(
                 {
                     "email": form.email,
                     "password": form.password,
@@ -94,8 +95,6 @@ class AuthService:
                 "email": res.user.email
             }
 
-            print(data['access_token'])
-            
             return data
 
             query_string = urlencode(data)
@@ -116,7 +115,7 @@ class AuthService:
 
     async def google_sign_in(self) -> RedirectResponse:
         try:
-            response = supabase.auth.sign_in_with_oauth(
+            response = await db.client.auth.sign_in_with_oauth(
                 {
                     "provider": "google",
                     "options": {
@@ -142,7 +141,7 @@ class AuthService:
     async def google_callback(self, code: str) -> Response:
         response = Response()
         try:
-            res = supabase.auth.exchange_code_for_session({"auth_code": code})
+            res = await db.client.auth.exchange_code_for_session({"auth_code": code})
 
             if not res or res.user is None:
                 raise HTTPException(
@@ -172,8 +171,9 @@ class AuthService:
             ) from e
 
     async def sign_out(self, token: str) -> SignOutResponseSchema:
+        token_verifier.revoke(token)
         try:
-            supabase.auth.admin.sign_out(token)
+            await db.client.auth.admin.sign_out(token)
         except Exception as e:
             raise HTTPException(
                 status_code=400, 
@@ -187,7 +187,7 @@ class AuthService:
             return {"access_token": access_token, "refresh_token": refresh_token}
 
         try:
-            res = supabase.auth.refresh_session(refresh_token)
+            res = await db.client.auth.refresh_session(refresh_token)
             if not res or res.session is None:
                 raise HTTPException(status_code=401, detail="Invalid refresh token")
 
@@ -201,7 +201,7 @@ class AuthService:
 
     async def get_claims(self, token: str) -> GetClaimsResponseSchema:
         try:
-            response = supabase.auth.get_claims(token)
+            response = await db.client.auth.get_claims(token)
             if not response or response.user is None:
                 raise HTTPException(
                     status_code=400,
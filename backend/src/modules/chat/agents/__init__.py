@@ -0,0 +1,7 @@
+from src.core.config import config
+from src.modules.chat.agents import main_agent, supervisor_agent
+
+# Both agents expose the same ainvoke/astream/astream_events interface
+agent = supervisor_agent if config.supervisor_enabled else main_agent
+
+__all__ = ["agent", "main_agent", "supervisor_agent"]
@@ -1,3 +0,0 @@
-from src.modules.chat.agents.main_agent import MainAgent
-
-__all__ = ["MainAgent"]
@@ -0,0 +1,59 @@
+from functools import lru_cache
+from langchain_core.language_models import BaseChatModel
+from src.core.config import config
+from src.common.concurrency import CircuitBreaker
+from src.modules.chat.agents.llm_metrics import LLMMetricsCallback
+from src.modules.chat.agents.resilient_llm import Endpoint, ResilientChatModel
+
+@lru_cache(maxsize=None)
+def get_chat_model(model: str, temperature: float, max_tokens: int | None = None, max_retries: int = 2) -> BaseChatModel:
+    """Return a shared chat model, constructing it on first use.
+
+    `model` is an OpenRouter model id, or `model@provider` for one of the
+    endpoints in `config.llm_providers`.
+
+    `langchain_openai` is imported here rather than at module level because
+    it (and the `openai` SDK behind it) dominates the import time of the app.
+    """
+    from langchain_openai import ChatOpenAI
+
+    name, _, provider = model.partition("@")
+    if provider:
+        endpoint = config.llm_providers[provider]
+        base_url, api_key = endpoint.base_url, endpoint.api_key
+    else:
+        base_url, api_key = config.openrouter_url, config.openrouter_api_key
+
+    return ChatOpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        model=name,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        max_retries=max_retries,
+        timeout=config.llm_request_timeout,
+        stream_usage=True,
+        callbacks=[LLMMetricsCallback(model)],
+    )
+
+@lru_cache(maxsize=None)
+def get_breaker(model: str) -> CircuitBreaker:
+    return CircuitBreaker(
+        failure_threshold=config.llm_breaker_failure_threshold,
+        reset_timeout=config.llm_breaker_reset_timeout,
+    )
+
+@lru_cache(maxsize=None)
+def get_resilient_model(
+    models: tuple[str, ...],
+    temperature: float,
+) -> ResilientChatModel:
+    """Return a shared model that hedges and fails over across `models`, in order.
+
+    Client-side retries are disabled: a failing endpoint should hand over to
+    the next one instead of being retried with backoff.
+    """
+    return ResilientChatModel(
+        [Endpoint(model, get_chat_model(model, temperature, max_retries=0), get_breaker(model)) for model in models],
+        hedge_delay=config.llm_hedge_delay,
+    )
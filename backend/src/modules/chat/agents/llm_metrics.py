@@ -0,0 +1,57 @@
+import time
+import asyncio
+from uuid import UUID
+from typing import Any
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from src.common.metrics import ERRORS, LLM_REQUEST_SECONDS, LLM_TIME_TO_FIRST_TOKEN_SECONDS, LLM_TOKENS
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """Record latency, time to first token and token usage of one model's calls.
+
+    Runs inline on the event loop (LangChain would otherwise hand sync
+    handlers to a thread pool); each hook is a dict operation and a
+    histogram observe.
+    """
+
+    run_inline = True
+
+    def __init__(self, model: str):
+        self.model = model
+        self._ttft = LLM_TIME_TO_FIRST_TOKEN_SECONDS.labels(model)
+        self._ok = LLM_REQUEST_SECONDS.labels(model, "ok")
+        self._prompt_tokens = LLM_TOKENS.labels(model, "prompt")
+        self._completion_tokens = LLM_TOKENS.labels(model, "completion")
+        # run_id -> [start time, first token seen]
+        self._runs: dict[UUID, list] = {}
+
+    def on_chat_model_start(self, serialized: dict, messages: list, *, run_id: UUID, **kwargs: Any) -> None:
+        self._runs[run_id] = [time.perf_counter(), False]
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._runs.get(run_id)
+        if run is not None and not run[1]:
+            run[1] = True
+            self._ttft.observe(time.perf_counter() - run[0])
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._runs.pop(run_id, None)
+        if run is not None:
+            self._ok.observe(time.perf_counter() - run[0])
+
+        usage = None
+        if response.generations and response.generations[0]:
+            message = getattr(response.generations[0][0], "message", None)
+            usage = getattr(message, "usage_metadata", None)
+        if usage:
+            self._prompt_tokens.observe(usage.get("input_tokens", 0))
+            self._completion_tokens.observe(usage.get("output_tokens", 0))
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._runs.pop(run_id, None)
+        # Hedged losers and abandoned streams are cancelled, not failed
+        outcome = "cancelled" if isinstance(error, (asyncio.CancelledError, GeneratorExit)) else "error"
+        if run is not None:
+            LLM_REQUEST_SECONDS.labels(self.model, outcome).observe(time.perf_counter() - run[0])
+        if outcome == "error":
+            ERRORS.labels("llm", type(error).__name__).inc()
@@ -1,55 +1,185 @@
-from langchain_openai import ChatOpenAI
+import json
+import hashlib
+import logging
+from uuid import UUID
+from typing import AsyncIterator
+from langchain_core.messages import AIMessage
+from langchain_core.tools import BaseTool
 from src.core.config import config
-from src.modules.chat.tools.web_search_tool import web_search_tool
-from src.modules.chat.tools.google_calendar_tool import google_calendar_tools
-
-SYSTEM_PROMPT = """
-You are a main AI assistant.
-You can delegate tasks to tools if needed.
-If you cannot answer, say so explicitly.
-"""
-
-llm = ChatOpenAI(
-    api_key=config.openrouter_api_key,
-    base_url=config.openrouter_url,
-    model="mistralai/devstral-2512:free",
-    temperature=0.5,
-    verbose=True,
+from src.common.concurrency import run_in_thread, StreamFlight
+from src.common.metrics import COALESCED_REQUESTS, cache_stats
+from src.common.tracing import span, traced
+from src.modules.chat.agents.llm_factory import get_resilient_model
+from src.modules.chat.agents.model_router import ModelRouter
+from src.modules.chat.agents.resilient_llm import ResilientChatModel
+from src.modules.chat.agents.tool_loop import bind_tools, arun_tool_calls
+from src.modules.chat.context_builder import _get_encoding
+from src.modules.chat.response_cache import ResponseCache
+from src.modules.chat.tools import tool_registry, resolve_tool_groups
+from src.modules.chat.tools.google_calendar_tool import calendar_tool_pool
+from src.modules.chat.tools.tool_selector import select_tools
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = "You are a helpful assistant with web search and Google Calendar management capabilities. You can create, search, update, move, and delete calendar events."
+
+TEMPERATURE = 0.5
+
+model_router = ModelRouter(
+    fast_models=config.fast_models,
+    strong_models=config.strong_models,
+    fast_max_prompt_tokens=config.router_fast_max_prompt_tokens,
+    fast_max_message_chars=config.router_fast_max_message_chars,
+    fast_max_tools=config.router_fast_max_tools
 )
 
-llm_with_tools = llm.bind_tools([web_search_tool] + google_calendar_tools)
+def get_llm(models: tuple[str, ...] | None = None) -> ResilientChatModel:
+    """Return the chat model over `models` in failover order, by default the strong tier."""
+    return get_resilient_model(
+        models or model_router.route_tier("strong").models,
+        temperature=TEMPERATURE
+    )
+
+response_cache = ResponseCache(
+    max_entries=config.response_cache_size,
+    ttl=config.response_cache_ttl,
+    similarity_threshold=config.response_cache_similarity
+) if config.response_cache_enabled else None
+
+if response_cache is not None:
+    cache_stats.register(
+        "response",
+        response_cache.stats,
+        {"exact_hit": "exact_hits", "semantic_hit": "semantic_hits", "miss": "misses"}
+    )
+
+flights = StreamFlight()
 
-# Create a dict of tools for easy lookup
-tools_dict = {tool.name: tool for tool in [web_search_tool] + google_calendar_tools}
+# Emitted by `astream_events` after each turn that ends in tool calls, so
+# callers can drop the text that came before the final turn.
+TOOL_TURN = object()
 
-def invoke(messages: list[dict]) -> dict:
+def _ensure_system_prompt(messages: list[dict]) -> None:
     if not messages or messages[0]["role"] != "system":
-        messages.insert(0, {
-            "role": "system",
-            "content": "You are a helpful assistant with web search and Google Calendar management capabilities. You can create, search, update, move, and delete calendar events."
-        })
-        
-    while True:
-        response = llm_with_tools.invoke(messages)
-        messages.append(response)
-        
-        if not response.tool_calls:
-            break
-        
-        for tool_call in response.tool_calls:
-            tool_name = tool_call["name"]
-            tool_args = tool_call["args"]
-            
-            if tool_name in tools_dict:
-                print(f"Invoking {tool_name} with args:", tool_args)
-                tool_result = tools_dict[tool_name].invoke(tool_args)
-                print(f"Tool result for {tool_name}:", tool_result)
-                
-                messages.append({
-                    "role": "tool",
-                    "content": str(tool_result),
-                    "tool_call_id": tool_call["id"]
-                })
-    
-    print("Final response:", response)
-    return response
+        messages.insert(0, {"role": "system", "content": SYSTEM_PROMPT})
+
+@traced("agent.resolve_tools")
+async def _resolve_tools(messages: list, user_id: UUID | None) -> dict[str, BaseTool]:
+    groups = await resolve_tool_groups(user_id)
+    if config.tool_selection_enabled:
+        # Only bind the schemas this turn plausibly needs; each one costs
+        # prompt tokens on every model call.
+        return select_tools(messages, groups, tuple(config.tool_selection_fallback))
+    return {tool.name: tool for tools in groups.values() for tool in tools}
+
+def _cacheable_prompt(messages: list) -> str | None:
+    # Only stand-alone questions are cached: with earlier turns in the prompt
+    # the answer may depend on context the cache key does not capture.
+    if response_cache is None or len(messages) != 2 or messages[1]["role"] != "user":
+        return None
+    return messages[1]["content"]
+
+def _cache_namespace(messages: list, tools_dict: dict[str, BaseTool]) -> str:
+    return messages[0]["content"] + "\n" + ",".join(sorted(tools_dict))
+
+def _cache_get(model: str, messages: list, tools_dict: dict[str, BaseTool]) -> str | None:
+    prompt = _cacheable_prompt(messages)
+    if prompt is None:
+        return None
+    return response_cache.get(model, _cache_namespace(messages, tools_dict), prompt)
+
+def _cache_set(model: str, messages: list, tools_dict: dict[str, BaseTool], answer: str) -> None:
+    prompt = _cacheable_prompt(messages)
+    if prompt is not None and answer:
+        response_cache.set(model, _cache_namespace(messages, tools_dict), prompt, answer)
+
+async def warm_up() -> None:
+    """Build the model client and shared tools off the request path."""
+    # The first load downloads the BPE file; token counting would otherwise
+    # do that on the event loop during the first chat request
+    await run_in_thread(_get_encoding, "cl100k_base")
+    for tier in model_router.tiers:
+        await run_in_thread(get_llm, model_router.route_tier(tier).models)
+    await tool_registry.warm_up()
+    await calendar_tool_pool.warm_up()
+
+def _flight_key(models: tuple[str, ...], tools_dict: dict[str, BaseTool], messages: list) -> str:
+    # Tools are identified by object as well as name: per-user Calendar tools
+    # are distinct instances, so two users never share a call that runs them.
+    tools = [(name, id(tool)) for name, tool in sorted(tools_dict.items())]
+    payload = json.dumps([models, tools, messages], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+async def _astream_loop(model: str, llm_with_tools: ResilientChatModel, messages: list, tools_dict: dict[str, BaseTool]) -> AsyncIterator[str | object]:
+    prompt_messages = list(messages)
+    used_tools = False
+
+    with span("agent.run", model=model, tools=",".join(tools_dict)):
+        while True:
+            response = None
+            async for chunk in llm_with_tools.astream(messages):
+                response = chunk if response is None else response + chunk
+                if isinstance(chunk.content, str) and chunk.content:
+                    yield chunk.content
+
+            if response is None:
+                break
+
+            messages.append(response)
+
+            if not response.tool_calls:
+                break
+
+            used_tools = True
+            await arun_tool_calls(messages, response.tool_calls, tools_dict)
+            yield TOOL_TURN
+
+    if response is not None and not used_tools:
+        _cache_set(model, prompt_messages, tools_dict, response.content)
+
+async def astream_events(messages: list[dict], user_id: UUID | None = None) -> AsyncIterator[str | object]:
+    """Like `astream`, but also yield `TOOL_TURN` after each turn that ends in tool calls."""
+    _ensure_system_prompt(messages)
+    tools_dict = await _resolve_tools(messages, user_id)
+    route = model_router.route(messages, tools_dict)
+
+    cached = _cache_get(route.model, messages, tools_dict)
+    if cached is not None:
+        yield cached
+        return
+
+    llm_with_tools = bind_tools(get_llm(route.models), tools_dict)
+    key = _flight_key(route.models, tools_dict, messages)
+    run = lambda: _astream_loop(route.model, llm_with_tools, list(messages), tools_dict)
+    if flights.in_flight(key):
+        COALESCED_REQUESTS.inc()
+    async for event in flights.subscribe(key, run):
+        yield event
+
+async def astream(messages: list[dict], user_id: UUID | None = None) -> AsyncIterator[str]:
+    """Run the agent loop and yield text deltas as the model produces them.
+
+    Every model turn is streamed, including any text the model writes in a
+    turn that ends in tool calls (e.g. "Let me check your calendar"); the
+    tools run before the next turn starts streaming. Identical requests
+    already in flight share one upstream run: a caller that joins late
+    replays the deltas produced so far.
+    """
+    async for event in astream_events(messages, user_id):
+        if event is not TOOL_TURN:
+            yield event
+
+@traced("agent.invoke")
+async def ainvoke(messages: list[dict], user_id: UUID | None = None) -> AIMessage:
+    """Run the agent loop and return only the final turn's answer."""
+    # Built on the shared stream so blocking and streaming callers coalesce
+    # with each other
+    deltas: list[str] = []
+    async for event in astream_events(messages, user_id):
+        if event is TOOL_TURN:
+            deltas.clear()
+        else:
+            deltas.append(event)
+    content = "".join(deltas)
+    logger.debug("Final response: %s", content)
+    return AIMessage(content=content)
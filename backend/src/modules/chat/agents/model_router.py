@@ -0,0 +1,60 @@
+import logging
+from dataclasses import dataclass
+from langchain_core.tools import BaseTool
+from src.common.metrics import ROUTER_DECISIONS
+from src.modules.chat.context_builder import count_tokens, MESSAGE_OVERHEAD_TOKENS
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class RouteDecision:
+    tier: str
+    reason: str
+    models: tuple[str, ...]
+
+    @property
+    def model(self) -> str:
+        return self.models[0]
+
+class ModelRouter:
+    """Pick a model tier per turn.
+
+    Turns with more tools bound than the fast tier handles, a long prompt or
+    a long latest message go to the strong tier; everything else goes to the fast tier. Each tier is an
+    ordered list of models, the first being the preferred one.
+    """
+
+    def __init__(
+        self,
+        fast_models: list[str],
+        strong_models: list[str],
+        fast_max_prompt_tokens: int,
+        fast_max_message_chars: int,
+        fast_max_tools: int = 1,
+    ):
+        self.tiers = {"fast": tuple(fast_models), "strong": tuple(strong_models)}
+        self.fast_max_prompt_tokens = fast_max_prompt_tokens
+        self.fast_max_message_chars = fast_max_message_chars
+        self.fast_max_tools = fast_max_tools
+
+    def _reason(self, messages: list, tools_dict: dict[str, BaseTool]) -> tuple[str, str]:
+        if len(tools_dict) > self.fast_max_tools:
+            return "strong", "tools"
+        last = messages[-1]["content"] if messages else ""
+        if len(last) > self.fast_max_message_chars:
+            return "strong", "long_message"
+        prompt_tokens = sum(count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS for message in messages)
+        if prompt_tokens > self.fast_max_prompt_tokens:
+            return "strong", "long_context"
+        return "fast", "short"
+
+    def route_tier(self, tier: str, reason: str = "explicit") -> RouteDecision:
+        fallback = [model for other, models in self.tiers.items() if other != tier for model in models]
+        models = tuple(dict.fromkeys([*self.tiers[tier], *fallback]))
+        return RouteDecision(tier=tier, reason=reason, models=models)
+
+    def route(self, messages: list, tools_dict: dict[str, BaseTool]) -> RouteDecision:
+        decision = self.route_tier(*self._reason(messages, tools_dict))
+        ROUTER_DECISIONS.labels(decision.tier, decision.reason, decision.model).inc()
+        logger.info("Routed turn to %s (%s tier, %s)", decision.model, decision.tier, decision.reason)
+        return decision
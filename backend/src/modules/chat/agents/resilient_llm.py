@@ -0,0 +1,154 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, AsyncIterator
+from langchain_core.messages import AIMessage, AIMessageChunk, message_chunk_to_message
+from langchain_core.runnables import Runnable
+from src.common.concurrency import CircuitBreaker
+from src.common.tracing import span
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class Endpoint:
+    name: str
+    llm: Runnable
+    breaker: CircuitBreaker
+
+def _is_retryable(exc: BaseException) -> bool:
+    # Other 4xx errors mean the request itself is bad; another endpoint
+    # would reject it too, and it says nothing about the endpoint's health.
+    status = getattr(exc, "status_code", None)
+    return status is None or status in (408, 409, 429) or status >= 500
+
+async def _next_chunk(stream: AsyncIterator[AIMessageChunk]) -> AIMessageChunk | None:
+    try:
+        return await stream.__anext__()
+    except StopAsyncIteration:
+        return None
+
+class _Attempt:
+    def __init__(self, endpoint: Endpoint, messages: list):
+        self.endpoint = endpoint
+        self.stream = aiter(endpoint.llm.astream(messages))
+        self.first = asyncio.ensure_future(_next_chunk(self.stream))
+
+    async def close(self) -> None:
+        self.first.cancel()
+        await asyncio.gather(self.first, return_exceptions=True)
+        aclose = getattr(self.stream, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+class ResilientChatModel:
+    """A chat model spread over an ordered list of endpoints.
+
+    The first endpoint whose circuit breaker allows it is called. If it has
+    not produced a first token within `hedge_delay` seconds, the next endpoint
+    is called as well and whichever answers first wins; the others are
+    cancelled. Endpoints that fail with a retryable error (network errors,
+    timeouts, 429s, 5xx) count against their breaker and the request fails
+    over to the next endpoint. Once a stream has started it is not switched.
+    """
+
+    def __init__(
+        self,
+        endpoints: list[Endpoint],
+        hedge_delay: float | None = None,
+    ):
+        self.endpoints = endpoints
+        self.hedge_delay = hedge_delay
+
+    def bind_tools(self, tools: list, **kwargs: Any) -> "ResilientChatModel":
+        return ResilientChatModel(
+            [Endpoint(e.name, e.llm.bind_tools(tools, **kwargs), e.breaker) for e in self.endpoints],
+            hedge_delay=self.hedge_delay,
+        )
+
+    def _launch(self, queue: list[Endpoint], messages: list) -> _Attempt | None:
+        while queue:
+            endpoint = queue.pop(0)
+            if endpoint.breaker.allow():
+                return _Attempt(endpoint, messages)
+            logger.info("Skipping %s, circuit open", endpoint.name)
+        return None
+
+    async def _first_chunk(self, messages: list) -> tuple[_Attempt, AIMessageChunk | None]:
+        queue = list(self.endpoints)
+        first = self._launch(queue, messages)
+        if first is None:
+            # Every breaker is open; calling the primary beats failing outright
+            first = _Attempt(self.endpoints[0], messages)
+        active = {first.first: first}
+        last_error: BaseException | None = None
+
+        try:
+            while active:
+                hedge = self.hedge_delay is not None and bool(queue)
+                done, _ = await asyncio.wait(
+                    active,
+                    timeout=self.hedge_delay if hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    attempt = self._launch(queue, messages)
+                    if attempt is not None:
+                        logger.info("No first token after %.1fs, hedging with %s", self.hedge_delay, attempt.endpoint.name)
+                        active[attempt.first] = attempt
+                    continue
+
+                for future in done:
+                    attempt = active.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        return attempt, future.result()
+                    if not _is_retryable(error):
+                        attempt.endpoint.breaker.release()
+                        raise error
+
+                    attempt.endpoint.breaker.record_failure()
+                    last_error = error
+                    logger.warning("%s failed: %r", attempt.endpoint.name, error)
+                    fallback = self._launch(queue, messages)
+                    if fallback is not None:
+                        logger.info("Failing over to %s", fallback.endpoint.name)
+                        active[fallback.first] = fallback
+
+            raise last_error
+        finally:
+            for attempt in active.values():
+                attempt.endpoint.breaker.release()
+                await attempt.close()
+
+    async def astream(self, messages: list) -> AsyncIterator[AIMessageChunk]:
+        with span("llm.call") as call:
+            attempt, chunk = await self._first_chunk(messages)
+            if call is not None:
+                call.attributes["model"] = attempt.endpoint.name
+                call.attributes["fallback"] = attempt.endpoint is not self.endpoints[0]
+            breaker = attempt.endpoint.breaker
+            try:
+                if chunk is not None:
+                    yield chunk
+                    async for chunk in attempt.stream:
+                        yield chunk
+            except Exception:
+                breaker.record_failure()
+                raise
+            except BaseException:
+                # Cancelled or closed by the consumer; not the endpoint's fault
+                breaker.release()
+                raise
+            else:
+                breaker.record_success()
+            finally:
+                await attempt.close()
+
+    async def ainvoke(self, messages: list) -> AIMessage:
+        response = None
+        async for chunk in self.astream(messages):
+            response = chunk if response is None else response + chunk
+        if response is None:
+            return AIMessage(content="")
+        return message_chunk_to_message(response)
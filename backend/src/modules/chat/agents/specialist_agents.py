@@ -0,0 +1,62 @@
+from dataclasses import dataclass
+from langchain_core.tools import BaseTool
+from src.core.config import config
+from src.modules.chat.agents.llm_factory import get_chat_model
+from src.modules.chat.agents.tool_loop import bind_tools, arun_loop
+
+@dataclass(frozen=True)
+class SpecialistAgent:
+    """A sub-agent with its own prompt, model and tool groups."""
+
+    name: str
+    description: str
+    system_prompt: str
+    model: str
+    tool_groups: tuple[str, ...] = ()
+    temperature: float = 0.3
+
+    def select_tools(self, groups: dict[str, list[BaseTool]]) -> dict[str, BaseTool]:
+        return {
+            tool.name: tool
+            for group in self.tool_groups
+            for tool in groups.get(group, ())
+        }
+
+    async def arun(self, task: str, groups: dict[str, list[BaseTool]]) -> str:
+        """Run the specialist's tool loop on a single self-contained task."""
+        tools_dict = self.select_tools(groups)
+        llm = get_chat_model(self.model, temperature=self.temperature)
+        messages = [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": task},
+        ]
+        response, _ = await arun_loop(bind_tools(llm, tools_dict), messages, tools_dict)
+        return response.content
+
+SPECIALISTS = {
+    agent.name: agent
+    for agent in (
+        SpecialistAgent(
+            name="search",
+            description="Looks up current facts, news and other information on the web.",
+            system_prompt="You are a research assistant. Use web search to answer the task and report the relevant facts concisely, citing sources where possible.",
+            model=config.search_agent_model,
+            tool_groups=("web_search",),
+        ),
+        SpecialistAgent(
+            name="calendar",
+            description="Reads and manages the user's Google Calendar: creates, searches, updates, moves and deletes events.",
+            system_prompt="You are a calendar assistant. Use the Google Calendar tools to carry out the task and report exactly what you found or changed.",
+            model=config.calendar_agent_model,
+            tool_groups=("calendar",),
+            temperature=0.0,
+        ),
+        SpecialistAgent(
+            name="reasoning",
+            description="Thinks problems through, writes, explains and calculates without any tools.",
+            system_prompt="You are a careful analyst. Work through the task step by step and give a clear, well-reasoned answer.",
+            model=config.reasoning_agent_model,
+            temperature=0.5,
+        ),
+    )
+}
@@ -0,0 +1,24 @@
+from langchain_core.messages import AIMessage
+from src.core.config import config
+from src.modules.chat.agents.llm_factory import get_chat_model
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and an AI assistant. "
+    "Update the existing summary with the new messages. Keep facts, decisions, names, dates "
+    "and open questions; drop small talk. Answer with the updated summary only."
+)
+
+def _format_transcript(messages: list[dict]) -> str:
+    return "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+
+async def asummarize(previous_summary: str | None, messages: list[dict]) -> str:
+    llm = get_chat_model(config.summary_model, temperature=0)
+    response: AIMessage = await llm.ainvoke([
+        {"role": "system", "content": SUMMARY_PROMPT},
+        {
+            "role": "user",
+            "content": f"Existing summary:\n{previous_summary or '(none)'}\n\n"
+                       f"New messages:\n{_format_transcript(messages)}"
+        },
+    ])
+    return response.content
@@ -0,0 +1,185 @@
+import re
+import json
+import asyncio
+import logging
+from uuid import UUID
+from typing import AsyncIterator, Literal
+from pydantic import BaseModel, ValidationError
+from langchain_core.messages import AIMessage
+from langchain_core.tools import BaseTool
+from src.core.config import config
+from src.modules.chat.agents import main_agent
+from src.modules.chat.agents.llm_factory import get_chat_model
+from src.modules.chat.agents.specialist_agents import SPECIALISTS
+from src.modules.chat.tools import resolve_tool_groups
+
+logger = logging.getLogger(__name__)
+
+PLANNER_PROMPT = """You coordinate a team of specialist agents:
+{specialists}
+
+Break the user's latest request into independent subtasks, one per specialist call. Each task must be self-contained, since the specialist will not see the conversation. Use at most {max_subtasks} subtasks, and only the specialists listed above. If the request needs no tools, return a single "reasoning" subtask.
+
+Respond with JSON only, in the form: {{"subtasks": [{{"agent": "search", "task": "..."}}]}}"""
+
+FINDINGS_PROMPT = """{request}
+
+---
+Specialist agents have worked on this request. Use their findings to write the answer; do not mention the agents themselves.
+
+{findings}"""
+
+class Subtask(BaseModel):
+    agent: Literal["search", "calendar", "reasoning"]
+    task: str
+
+class Plan(BaseModel):
+    subtasks: list[Subtask]
+
+class SubtaskResult(BaseModel):
+    subtask: Subtask
+    status: Literal["ok", "error", "timeout"]
+    content: str = ""
+
+def _planner_prompt(groups: dict[str, list[BaseTool]]) -> str:
+    # Specialists whose tools the user has not set up are not offered
+    available = [
+        agent for agent in SPECIALISTS.values()
+        if all(groups.get(group) for group in agent.tool_groups)
+    ]
+    return PLANNER_PROMPT.format(
+        specialists="\n".join(f"- {agent.name}: {agent.description}" for agent in available),
+        max_subtasks=config.supervisor_max_subtasks
+    )
+
+def _parse_plan(content: str, groups: dict[str, list[BaseTool]]) -> list[Subtask]:
+    match = re.search(r"\{.*\}", content, re.DOTALL)
+    if match is None:
+        return []
+    try:
+        plan = Plan.model_validate(json.loads(match.group(0)))
+    except (json.JSONDecodeError, ValidationError):
+        return []
+    return [
+        subtask for subtask in plan.subtasks
+        if subtask.task.strip()
+        and all(groups.get(group) for group in SPECIALISTS[subtask.agent].tool_groups)
+    ][:config.supervisor_max_subtasks]
+
+async def plan(messages: list[dict], groups: dict[str, list[BaseTool]]) -> list[Subtask]:
+    """Ask the planner model to split the conversation's last request into subtasks.
+
+    Returns an empty list if the planner fails or its output cannot be
+    used, so the caller falls back to the main agent.
+    """
+    llm = get_chat_model(config.planner_model, temperature=0.0)
+    conversation = [message for message in messages if message["role"] != "system"]
+    try:
+        response: AIMessage = await llm.ainvoke([
+            {"role": "system", "content": _planner_prompt(groups)},
+            *conversation,
+        ])
+    except Exception:
+        logger.warning("Supervisor planner failed; answering with the main agent", exc_info=True)
+        return []
+    subtasks = _parse_plan(response.content, groups)
+    logger.info("Supervisor plan: %s", [(subtask.agent, subtask.task) for subtask in subtasks])
+    return subtasks
+
+async def dispatch(subtasks: list[Subtask], groups: dict[str, list[BaseTool]]) -> list[SubtaskResult]:
+    """Run subtasks concurrently and collect whatever finishes before the deadline.
+
+    Subtasks still running at the deadline are cancelled and reported as timed
+    out; the results keep the order of the plan.
+    """
+    tasks = [
+        asyncio.create_task(SPECIALISTS[subtask.agent].arun(subtask.task, groups))
+        for subtask in subtasks
+    ]
+    pending = set(tasks)
+    try:
+        _, pending = await asyncio.wait(tasks, timeout=config.supervisor_deadline)
+    finally:
+        for task in pending:
+            task.cancel()
+        # Wait for the cancellations to land so no task is left running or
+        # with an exception nobody retrieved
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    results = []
+    for subtask, task in zip(subtasks, tasks):
+        if task in pending:
+            results.append(SubtaskResult(subtask=subtask, status="timeout"))
+        elif task.exception() is not None:
+            logger.error("Specialist %s failed", subtask.agent, exc_info=task.exception())
+            results.append(SubtaskResult(subtask=subtask, status="error"))
+        else:
+            results.append(SubtaskResult(subtask=subtask, status="ok", content=task.result()))
+    return results
+
+def _format_findings(results: list[SubtaskResult]) -> str:
+    sections = []
+    for result in results:
+        if result.status == "ok":
+            outcome = result.content
+        elif result.status == "timeout":
+            outcome = "(did not finish in time; no result)"
+        else:
+            outcome = "(failed; no result)"
+        sections.append(f"[{result.subtask.agent}] {result.subtask.task}\n{outcome}")
+    return "\n\n".join(sections)
+
+def _synthesis_messages(messages: list[dict], results: list[SubtaskResult]) -> list[dict]:
+    # The findings are folded into the last user turn rather than appended as a
+    # separate message, since not every provider accepts a trailing system turn.
+    *history, request = messages
+    return [
+        *history,
+        {
+            "role": request["role"],
+            "content": FINDINGS_PROMPT.format(request=request["content"], findings=_format_findings(results))
+        }
+    ]
+
+async def _prepare(messages: list[dict], user_id: UUID | None) -> list[dict] | None:
+    """Plan and run the specialists, returning the synthesis prompt.
+
+    Returns None when the request does not benefit from delegation, in which
+    case the caller should answer with the main agent instead.
+    """
+    groups = await resolve_tool_groups(user_id)
+    subtasks = await plan(messages, groups)
+    if not subtasks or all(subtask.agent == "reasoning" for subtask in subtasks):
+        return None
+    results = await dispatch(subtasks, groups)
+    return _synthesis_messages(messages, results)
+
+async def ainvoke(messages: list[dict], user_id: UUID | None = None) -> AIMessage:
+    main_agent._ensure_system_prompt(messages)
+    synthesis = await _prepare(messages, user_id)
+    if synthesis is None:
+        return await main_agent.ainvoke(messages, user_id=user_id)
+    return await main_agent.get_llm().ainvoke(synthesis)
+
+async def astream_events(messages: list[dict], user_id: UUID | None = None) -> AsyncIterator[str | object]:
+    """Plan and dispatch silently, then stream the synthesised answer.
+
+    Falls back to `main_agent.astream_events`, whose `TOOL_TURN` markers are
+    passed through.
+    """
+    main_agent._ensure_system_prompt(messages)
+    synthesis = await _prepare(messages, user_id)
+    if synthesis is None:
+        async for event in main_agent.astream_events(messages, user_id=user_id):
+            yield event
+        return
+
+    async for chunk in main_agent.get_llm().astream(synthesis):
+        if isinstance(chunk.content, str) and chunk.content:
+            yield chunk.content
+
+async def astream(messages: list[dict], user_id: UUID | None = None) -> AsyncIterator[str]:
+    """Plan and dispatch silently, then stream the synthesised answer."""
+    async for event in astream_events(messages, user_id):
+        if event is not main_agent.TOOL_TURN:
+            yield event
@@ -0,0 +1,14 @@
+from langchain_core.messages import AIMessage
+from src.core.config import config
+from src.modules.chat.agents.llm_factory import get_chat_model
+
+MAX_TITLE_LENGTH = 60
+
+async def agenerate_title(user_message: str) -> str:
+    llm = get_chat_model(config.title_model, temperature=0.2, max_tokens=24)
+    response: AIMessage = await llm.ainvoke([
+        {"role": "system", "content": config.title_generation_prompt},
+        {"role": "user", "content": user_message},
+    ])
+    title = response.content.strip().strip("\"'").splitlines()[0] if response.content.strip() else ""
+    return title[:MAX_TITLE_LENGTH] or user_message[:MAX_TITLE_LENGTH]
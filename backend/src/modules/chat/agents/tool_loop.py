@@ -0,0 +1,123 @@
+import json
+import time
+import asyncio
+import logging
+from typing import Any
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import Runnable
+from langchain_core.tools import BaseTool, StructuredTool
+from src.core.config import config
+from src.common.concurrency import run_in_thread
+from src.common.metrics import ERRORS, TOOL_SECONDS
+from src.common.tracing import span
+from src.modules.chat.agents.resilient_llm import ResilientChatModel
+
+logger = logging.getLogger(__name__)
+
+# Tool schemas do not depend on whose credentials back the tools, so one
+# bound model per (model, tool set) pair is enough.
+_bound_llms: dict[tuple[int, tuple[str, ...]], Runnable] = {}
+
+def bind_tools(llm: BaseChatModel | ResilientChatModel, tools_dict: dict[str, BaseTool]) -> Runnable:
+    if not tools_dict:
+        return llm
+    key = (id(llm), tuple(tools_dict))
+    bound = _bound_llms.get(key)
+    if bound is None:
+        bound = _bound_llms[key] = llm.bind_tools(list(tools_dict.values()))
+    return bound
+
+def _has_native_async(tool: BaseTool) -> bool:
+    if isinstance(tool, StructuredTool):
+        return tool.coroutine is not None
+    return type(tool)._arun is not BaseTool._arun
+
+async def _arun_tool(tool: BaseTool, tool_args: dict) -> Any:
+    if _has_native_async(tool):
+        return await tool.ainvoke(tool_args)
+    # Sync-only tools would block the event loop, so they go to the bounded pool
+    return await run_in_thread(tool.invoke, tool_args)
+
+def _tool_message(tool_call: dict, content: Any) -> dict:
+    return {
+        "role": "tool",
+        "content": str(content),
+        "tool_call_id": tool_call["id"]
+    }
+
+async def _arun_tool_call(tool_call: dict, tools_dict: dict[str, BaseTool]) -> dict:
+    """Run one tool call and return its tool message.
+
+    Never raises: a timeout, a failing tool or a tool the model made up are
+    reported back to the model as a JSON error, since every tool call needs
+    an answer before the next model call.
+    """
+    tool_name = tool_call["name"]
+    tool_args = tool_call["args"]
+    timeout = config.stream_timeout
+
+    tool = tools_dict.get(tool_name)
+    if tool is None:
+        logger.warning("Model called unknown tool %r", tool_name)
+        ERRORS.labels("tool", "UnknownTool").inc()
+        return _tool_message(tool_call, json.dumps({"error": "unknown_tool", "tool": tool_name}))
+
+    logger.debug("Invoking %s with args: %s", tool_name, tool_args)
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        with span(f"tool.{tool_name}"):
+            tool_result = await asyncio.wait_for(_arun_tool(tool, tool_args), timeout=timeout)
+    except asyncio.TimeoutError:
+        outcome = "timeout"
+        tool_result = json.dumps({
+            "error": "timeout",
+            "tool": tool_name,
+            "timeout_seconds": timeout
+        })
+    except Exception as error:
+        outcome = "error"
+        ERRORS.labels("tool", type(error).__name__).inc()
+        logger.warning("Tool %s failed", tool_name, exc_info=True)
+        tool_result = json.dumps({
+            "error": type(error).__name__,
+            "tool": tool_name,
+            "message": str(error)
+        })
+    finally:
+        TOOL_SECONDS.labels(tool_name, outcome).observe(time.perf_counter() - started)
+    logger.debug("Tool result for %s: %s", tool_name, tool_result)
+
+    return _tool_message(tool_call, tool_result)
+
+async def arun_tool_calls(messages: list, tool_calls: list[dict], tools_dict: dict[str, BaseTool]) -> None:
+    # Tool calls within one turn are independent, so they run concurrently;
+    # gather keeps results in the order the model issued them.
+    results = await asyncio.gather(*(
+        _arun_tool_call(tool_call, tools_dict)
+        for tool_call in tool_calls
+    ))
+    messages.extend(results)
+
+async def arun_loop(
+    llm_with_tools: Runnable,
+    messages: list,
+    tools_dict: dict[str, BaseTool]
+) -> tuple[AIMessage, bool]:
+    """Call the model and run its tool calls until it answers without any.
+
+    Returns:
+        tuple[AIMessage, bool]: The final response and whether any tool ran.
+    """
+    used_tools = False
+
+    while True:
+        response = await llm_with_tools.ainvoke(messages)
+        messages.append(response)
+
+        if not response.tool_calls:
+            return response, used_tools
+
+        used_tools = True
+        await arun_tool_calls(messages, response.tool_calls, tools_dict)
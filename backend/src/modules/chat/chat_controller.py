@@ -1,8 +1,35 @@
+import math
 from uuid import UUID
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Header, Request
+from fastapi.responses import JSONResponse
 from src.modules.chat.chat_service import ChatService
 from src.modules.chat.chat_schema import CreateChatSchema, SendMessageSchema
 from src.modules.auth.dependencies import get_current_user
+from src.common.concurrency import AdmissionRejected
+from src.common.idempotency import IdempotencyInProgress, IdempotencyKeyReused
+from src.common.tracing import traced
+
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected) -> JSONResponse:
+    """Answer 429 when the user is over their rate and 503 when the service is out of capacity."""
+    if exc.reason == "user_rate":
+        status_code, detail = 429, "Too many requests, try again later"
+    else:
+        status_code, detail = 503, "Service is busy, try again later"
+    return JSONResponse(
+        status_code=status_code,
+        content={"detail": detail},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))}
+    )
+
+async def idempotency_in_progress_handler(request: Request, exc: IdempotencyInProgress) -> JSONResponse:
+    return JSONResponse(
+        status_code=409,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))}
+    )
+
+async def idempotency_key_reused_handler(request: Request, exc: IdempotencyKeyReused) -> JSONResponse:
+    return JSONResponse(status_code=422, content={"detail": str(exc)})
 
 class ChatController:
     def __init__(self, service: ChatService):
@@ -13,26 +40,58 @@ class ChatController:
     def _routes(self):
         self.router.get("/chats")(self.list_chats)
         self.router.post("/")(self.create_chat)
+        self.router.post("/stream")(self.create_chat_stream)
         self.router.post("/{chat_id}/messages")(self.send_message)
         self.router.post("/{chat_id}/stream")(self.stream_message)
         self.router.get("/{chat_id}")(self.get_chat)
 
-    async def create_chat(self, data: CreateChatSchema, user=Depends(get_current_user)):
-        return await self.service.create_chat(user.id, data.message)
+    @traced("controller.create_chat")
+    async def create_chat(
+        self,
+        data: CreateChatSchema,
+        user=Depends(get_current_user),
+        idempotency_key: str | None = Header(None, alias="Idempotency-Key")
+    ):
+        return await self.service.create_chat(user.id, data.message, idempotency_key)
+
+    @traced("controller.create_chat_stream")
+    async def create_chat_stream(
+        self,
+        data: CreateChatSchema,
+        user=Depends(get_current_user),
+        idempotency_key: str | None = Header(None, alias="Idempotency-Key")
+    ):
+        return await self.service.create_chat_stream(user.id, data.message, idempotency_key)
 
-    async def send_message(self, chat_id: UUID, data: SendMessageSchema, user=Depends(get_current_user)):
-        messages = await self.service.send_message(chat_id, user.id, data.message)
+    @traced("controller.send_message")
+    async def send_message(
+        self,
+        chat_id: UUID,
+        data: SendMessageSchema,
+        user=Depends(get_current_user),
+        idempotency_key: str | None = Header(None, alias="Idempotency-Key")
+    ):
+        messages = await self.service.send_message(chat_id, user.id, data.message, idempotency_key)
         return {"chat_id": chat_id, "messages": messages}
 
-    async def stream_message(self, chat_id: UUID, request: Request, user=Depends(get_current_user)):
+    @traced("controller.stream_message")
+    async def stream_message(
+        self,
+        chat_id: UUID,
+        request: Request,
+        user=Depends(get_current_user),
+        idempotency_key: str | None = Header(None, alias="Idempotency-Key")
+    ):
         data = await request.json()
         user_message = data.get("message")
-        return await self.service.stream_response(chat_id, user_message)
+        return await self.service.stream_response(chat_id, user.id, user_message, idempotency_key)
 
+    @traced("controller.get_chat")
     async def get_chat(self, chat_id: UUID, user=Depends(get_current_user)):
-        messages = self.service.repo.get_messages(chat_id)
-        chat = self.service.repo.get_chat(chat_id, user.id)
+        messages = await self.service.repo.get_messages(chat_id)
+        chat = await self.service.repo.get_chat(chat_id, user.id)
         return {"chat_id": chat_id, "title": chat.get("title"), "messages": messages}
 
+    @traced("controller.list_chats")
     async def list_chats(self, user=Depends(get_current_user)):
-        return self.service.repo.list_chats(user.id)
+        return await self.service.repo.list_chats(user.id)
@@ -1,16 +1,65 @@
+import asyncio
+import logging
 from fastapi import APIRouter
-from src.core.db import supabase
+from src.core import db, config
+from src.common.concurrency import AdmissionController
+from src.common.metrics import cache_stats
+from src.common.idempotency import Idempotency, InMemoryIdempotencyStore
 from src.modules.chat.chat_controller import ChatController
 from src.modules.chat.chat_service import ChatService
+from src.modules.chat.agents import main_agent
 from src.modules.chat.repositories.chat_repository import ChatRepository
+from src.modules.chat.repositories.message_write_behind import MessageWriteBehind
+
+logger = logging.getLogger(__name__)
 
 class ChatModule:
     def __init__(self):
-        repo = ChatRepository(supabase)
-        service = ChatService(repo)
+        self._warm_up_task: asyncio.Task | None = None
+        self.write_behind = MessageWriteBehind(
+            db,
+            batch_size=config.message_flush_batch_size,
+            flush_interval=config.message_flush_interval_ms / 1000,
+            max_backoff=config.message_flush_max_backoff
+        ) if config.message_write_behind else None
+
+        repo = ChatRepository(db, write_behind=self.write_behind)
+        cache_stats.register("history", repo.history_cache.stats, {"hit": "hits", "miss": "misses"})
+        # Swap the store for a shared one when running several workers
+        idempotency = Idempotency(InMemoryIdempotencyStore(
+            max_entries=config.idempotency_cache_size,
+            ttl=config.idempotency_ttl
+        ))
+        self.admission = AdmissionController(
+            max_concurrent=config.admission_max_concurrent,
+            max_queue=config.admission_max_queue,
+            queue_timeout=config.admission_queue_timeout,
+            user_rate=config.user_rate_per_minute / 60,
+            user_burst=config.user_burst
+        )
+        service = ChatService(repo, self.admission, idempotency=idempotency)
         controller = ChatController(service)
 
         self.router = APIRouter()
         self.router.include_router(controller.router, prefix="/chat", tags=["Chat"])
 
+    async def startup(self) -> None:
+        if self.write_behind is not None:
+            self.write_behind.start()
+        # Heavy clients are built in the background so the worker can accept
+        # requests immediately; anything not ready yet is built on first use.
+        self._warm_up_task = asyncio.create_task(self._warm_up())
+
+    async def _warm_up(self) -> None:
+        try:
+            await main_agent.warm_up()
+        except Exception:
+            logger.exception("Chat warm-up failed")
+
+    async def shutdown(self) -> None:
+        if self._warm_up_task is not None:
+            self._warm_up_task.cancel()
+        if self.write_behind is not None:
+            await self.write_behind.stop()
+
 chat_module = ChatModule()
@@ -1,78 +1,317 @@
 import json
+import weakref
 import asyncio
+import logging
 from uuid import UUID
+from typing import AsyncIterator
 from fastapi.responses import StreamingResponse
 from src.modules.chat.repositories.chat_repository import ChatRepository
-from src.modules.chat.agents.main_agent import invoke
+from src.core import config
+from src.common.concurrency import AdmissionController, AdmissionTicket, Priority
+from src.common.tracing import traced
+from src.common.idempotency import Idempotency, InMemoryIdempotencyStore, fingerprint
+from src.modules.chat.agents import agent
+from src.modules.chat.agents.main_agent import SYSTEM_PROMPT, TOOL_TURN
+from src.modules.chat.agents.summary_agent import asummarize
+from src.modules.chat.agents.title_agent import agenerate_title, MAX_TITLE_LENGTH
+from src.modules.chat.context_builder import ContextBuilder
+
+logger = logging.getLogger(__name__)
+
+def _hold_until_done(ticket: AdmissionTicket, lines: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Keep an admission slot for as long as a response stream is being produced."""
+    async def held():
+        try:
+            async for line in lines:
+                yield line
+        finally:
+            ticket.release()
+
+    stream = held()
+    # A generator that is never iterated never runs its finally block. The
+    # finalizer can run from the garbage collector on any thread, so the
+    # release (which may wake a queued waiter) is handed to the loop.
+    weakref.finalize(stream, _release_on_loop, asyncio.get_running_loop(), ticket)
+    return stream
+
+def _release_on_loop(loop: asyncio.AbstractEventLoop, ticket: AdmissionTicket) -> None:
+    if not loop.is_closed():
+        loop.call_soon_threadsafe(ticket.release)
+
+async def _gather_or_cancel(*aws):
+    """Like `asyncio.gather`, but cancel and await the others as soon as one fails."""
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
 
 class ChatService:
-    def __init__(self, repo: ChatRepository):
+    def __init__(
+        self,
+        repo: ChatRepository,
+        admission: AdmissionController,
+        context_builder: ContextBuilder | None = None,
+        idempotency: Idempotency | None = None
+    ):
         self.repo = repo
+        self.admission = admission
+        self.idempotency = idempotency or Idempotency(InMemoryIdempotencyStore())
+        self.context_builder = context_builder or ContextBuilder(
+            system_prompt=SYSTEM_PROMPT,
+            max_tokens=config.max_prompt_tokens,
+            max_messages=config.max_chat_history
+        )
+        self._summary_tasks: dict[UUID, asyncio.Task] = {}
+        self._title_tasks: set[asyncio.Task] = set()
+
+    @traced("service.build_history")
+    async def _build_history(self, chat_id: UUID, user_message: str) -> tuple[list[dict], int]:
+        """Build the agent prompt for a new user turn.
+
+        Returns:
+            tuple[list[dict], int]: The prompt messages and the number of
+            stored messages (including the new user turn) that are not yet
+            covered by the chat's summary.
+        """
+        messages, summary = await asyncio.gather(
+            self.repo.get_messages(chat_id),
+            self.repo.get_summary(chat_id)
+        )
+        covered = summary["message_count"] if summary else 0
+
+        history = [{"role": m["role"], "content": m["content"]} for m in messages[covered:]]
+        history.append({"role": "user", "content": user_message})
+
+        context = self.context_builder.build(history, summary["summary"] if summary else None)
+        if context.dropped_messages:
+            logger.info(
+                "chat %s: dropped %d messages (%d tokens) to fit %d-token prompt budget",
+                chat_id, context.dropped_messages, context.dropped_tokens, self.context_builder.max_tokens
+            )
+        return context.messages, len(history)
+
+    def _schedule_summary_refresh(self, chat_id: UUID, unsummarized: int) -> None:
+        if unsummarized < config.summary_keep_recent + config.summary_refresh_interval:
+            return
+        if chat_id in self._summary_tasks:
+            return
+
+        task = asyncio.create_task(self._refresh_summary(chat_id))
+        self._summary_tasks[chat_id] = task
+        task.add_done_callback(lambda _: self._summary_tasks.pop(chat_id, None))
+
+    async def _refresh_summary(self, chat_id: UUID) -> None:
+        """Fold every message except the most recent ones into the stored summary."""
+        try:
+            messages, summary = await asyncio.gather(
+                self.repo.get_messages(chat_id),
+                self.repo.get_summary(chat_id)
+            )
+            covered = summary["message_count"] if summary else 0
+            upto = len(messages) - config.summary_keep_recent
+            # The trigger may have been computed from a summary that has since
+            # been refreshed, so re-check against the stored state
+            if upto - covered < config.summary_refresh_interval:
+                return
+
+            async with self.admission.slot(priority=Priority.BACKGROUND):
+                new_summary = await asummarize(
+                    summary["summary"] if summary else None,
+                    [{"role": m["role"], "content": m["content"]} for m in messages[covered:upto]]
+                )
+            await self.repo.save_summary(chat_id, new_summary, upto)
+        except Exception:
+            logger.exception("chat %s: failed to refresh summary", chat_id)
+
+    async def _generate_title(self, chat_id: UUID, user_message: str) -> str:
+        try:
+            async with self.admission.slot(priority=Priority.BACKGROUND):
+                title = await agenerate_title(user_message)
+        except Exception:
+            logger.exception("chat %s: title generation failed", chat_id)
+            title = user_message[:MAX_TITLE_LENGTH]
+
+        try:
+            await self.repo.update_title(chat_id, title)
+        except Exception:
+            logger.exception("chat %s: failed to store title", chat_id)
+        return title
+
+    def _start_title_task(self, chat_id: UUID, user_message: str) -> asyncio.Task:
+        # Runs alongside the answer; it keeps going in the background if the
+        # answer finishes first, so it never adds to chat creation latency
+        task = asyncio.create_task(self._generate_title(chat_id, user_message))
+        self._title_tasks.add(task)
+        task.add_done_callback(self._title_tasks.discard)
+        return task
+
+    @staticmethod
+    def _scoped_key(user_id: UUID, idempotency_key: str) -> str:
+        # Keys are chosen by clients, so they are only unique per user
+        return f"{user_id}:{idempotency_key}"
+
+    async def _idempotent(self, user_id: UUID, idempotency_key: str | None, request: tuple, func):
+        # Admission is checked only when the request actually runs; replays
+        # and retries that join a running request do not take a slot
+        async def admitted():
+            async with self.admission.slot(user_id):
+                return await func()
+
+        if idempotency_key is None:
+            return await admitted()
+        return await self.idempotency.run(self._scoped_key(user_id, idempotency_key), fingerprint(*request), admitted)
+
+    async def _idempotent_stream(self, user_id: UUID, idempotency_key: str | None, request: tuple, start) -> StreamingResponse:
+        async def admitted_start():
+            ticket = await self.admission.acquire(user_id)
+            try:
+                lines = await start()
+            except BaseException:
+                ticket.release()
+                raise
+            return _hold_until_done(ticket, lines)
+
+        if idempotency_key is None:
+            lines = await admitted_start()
+        else:
+            lines = await self.idempotency.stream(self._scoped_key(user_id, idempotency_key), fingerprint(*request), admitted_start)
+        return StreamingResponse(lines, media_type="application/x-ndjson")
 
-    async def create_chat(self, user_id: UUID, user_message: str):
-        chat = self.repo.create_chat(
+    @traced("service.create_chat")
+    async def create_chat(self, user_id: UUID, user_message: str, idempotency_key: str | None = None):
+        return await self._idempotent(
+            user_id, idempotency_key, ("create_chat", user_message),
+            lambda: self._create_chat(user_id, user_message)
+        )
+
+    async def _create_chat(self, user_id: UUID, user_message: str):
+        chat = await self.repo.create_chat(
             user_id=user_id,
             title="New chat"
         )
 
         chat_id = chat["id"]
+        title_task = self._start_title_task(chat_id, user_message)
 
-        user_msg = self.repo.add_message(
-            chat_id=chat_id,
-            role="user",
-            content=user_message
+        user_msg, response = await _gather_or_cancel(
+            self.repo.add_message(
+                chat_id=chat_id,
+                role="user",
+                content=user_message
+            ),
+            agent.ainvoke([
+                {"role": "user", "content": user_message}
+            ], user_id=user_id)
         )
 
-        response = invoke([
-            {"role": "user", "content": user_message}
-        ])
-
         ai_content = response.content
 
-        ai_msg = self.repo.add_message(
+        ai_msg = await self.repo.add_message(
             chat_id=chat_id,
             role="assistant",
             content=ai_content
         )
 
-        title = user_message[:60]
-
-        self.repo.supabase.table("ai_chats") \
-            .update({"title": title}) \
-            .eq("id", chat_id) \
-            .execute()
+        if title_task.done():
+            chat["title"] = title_task.result()
 
         return {
             "chat": chat,
             "messages": [user_msg, ai_msg]
         }
 
-    async def send_message(self, chat_id: UUID, user_id: UUID, user_message: str):
-        messages = self.repo.get_messages(chat_id)
-        history = [{"role": m["role"], "content": m["content"]} for m in messages]
+    @traced("service.create_chat_stream")
+    async def create_chat_stream(self, user_id: UUID, user_message: str, idempotency_key: str | None = None):
+        return await self._idempotent_stream(
+            user_id, idempotency_key, ("create_chat_stream", user_message),
+            lambda: self._start_chat_stream(user_id, user_message)
+        )
+
+    async def _start_chat_stream(self, user_id: UUID, user_message: str) -> AsyncIterator[str]:
+        chat = await self.repo.create_chat(
+            user_id=user_id,
+            title="New chat"
+        )
 
-        history.append({"role": "user", "content": user_message})
-        self.repo.add_message(chat_id, "user", user_message)
+        chat_id = chat["id"]
+        title_task = self._start_title_task(chat_id, user_message)
+        user_msg_task = asyncio.create_task(self.repo.add_message(chat_id, "user", user_message))
 
-        ai_response = invoke(history).content
-        self.repo.add_message(chat_id, "assistant", ai_response)
+        async def event_generator():
+            yield json.dumps({"event": "chat", "chat": chat}, default=str) + "\n"
 
-        return self.repo.get_messages(chat_id)
+            title_sent = False
+            chunks = []
+            try:
+                async for delta in agent.astream_events([{"role": "user", "content": user_message}], user_id=user_id):
+                    if user_msg_task.done():
+                        # Stop generating as soon as the user message failed to save
+                        user_msg_task.result()
+                    if delta is TOOL_TURN:
+                        # Only the final turn is stored, as with `agent.ainvoke`
+                        chunks.clear()
+                        continue
+                    chunks.append(delta)
+                    yield json.dumps({"role": "assistant", "content": delta}) + "\n"
 
-    async def stream_response(self, chat_id: UUID, user_message: str):
-        messages = self.repo.get_messages(chat_id)
-        history = [{"role": m["role"], "content": m["content"]} for m in messages]
+                    if not title_sent and title_task.done():
+                        title_sent = True
+                        yield json.dumps({"event": "title", "title": title_task.result()}) + "\n"
+            except BaseException:
+                user_msg_task.cancel()
+                await asyncio.gather(user_msg_task, return_exceptions=True)
+                raise
 
-        history.append({"role": "user", "content": user_message})
-        self.repo.add_message(chat_id, "user", user_message)
+            await user_msg_task
+            await self.repo.add_message(chat_id, "assistant", "".join(chunks))
+
+            if not title_sent:
+                yield json.dumps({"event": "title", "title": await title_task}) + "\n"
+
+        return event_generator()
+
+    @traced("service.send_message")
+    async def send_message(self, chat_id: UUID, user_id: UUID, user_message: str, idempotency_key: str | None = None):
+        return await self._idempotent(
+            user_id, idempotency_key, ("send_message", chat_id, user_message),
+            lambda: self._send_message(chat_id, user_id, user_message)
+        )
+
+    async def _send_message(self, chat_id: UUID, user_id: UUID, user_message: str):
+        history, unsummarized = await self._build_history(chat_id, user_message)
+        await self.repo.add_message(chat_id, "user", user_message)
+
+        ai_response = (await agent.ainvoke(history, user_id=user_id)).content
+        await self.repo.add_message(chat_id, "assistant", ai_response)
+        self._schedule_summary_refresh(chat_id, unsummarized + 1)
+
+        return await self.repo.get_messages(chat_id)
+
+    @traced("service.stream_response")
+    async def stream_response(self, chat_id: UUID, user_id: UUID, user_message: str, idempotency_key: str | None = None):
+        return await self._idempotent_stream(
+            user_id, idempotency_key, ("stream_response", chat_id, user_message),
+            lambda: self._start_stream_response(chat_id, user_id, user_message)
+        )
+
+    async def _start_stream_response(self, chat_id: UUID, user_id: UUID, user_message: str) -> AsyncIterator[str]:
+        history, unsummarized = await self._build_history(chat_id, user_message)
+        await self.repo.add_message(chat_id, "user", user_message)
 
         async def event_generator():
-            ai_response = invoke(history).content
-            self.repo.add_message(chat_id, "assistant", ai_response)
+            chunks = []
+            async for delta in agent.astream_events(history, user_id=user_id):
+                if delta is TOOL_TURN:
+                    chunks.clear()
+                    continue
+                chunks.append(delta)
+                yield json.dumps({"role": "assistant", "content": delta}) + "\n"
 
-            chunk_size = 50
-            for i in range(0, len(ai_response), chunk_size):
-                yield json.dumps({"role": "assistant", "content": ai_response[i:i+chunk_size]}) + "\n"
-                await asyncio.sleep(0.05)
+            await self.repo.add_message(chat_id, "assistant", "".join(chunks))
+            self._schedule_summary_refresh(chat_id, unsummarized + 1)
 
-        return StreamingResponse(event_generator(), media_type="application/json")
+        return event_generator()
@@ -0,0 +1,86 @@
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+# Fixed per-message cost of the chat format (role, separators), as in the
+# OpenAI cookbook's token counting recipe.
+MESSAGE_OVERHEAD_TOKENS = 4
+
+@lru_cache()
+def _get_encoding(name: str) -> tiktoken.Encoding | None:
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception:
+        logger.warning("tiktoken encoding %s unavailable, estimating tokens from length", name)
+        return None
+
+@lru_cache(maxsize=8192)
+def count_tokens(text: str, encoding_name: str = "cl100k_base") -> int:
+    encoding = _get_encoding(encoding_name)
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+@dataclass
+class PromptContext:
+    messages: list[dict]
+    prompt_tokens: int
+    dropped_messages: int
+    dropped_tokens: int
+
+class ContextBuilder:
+    """Select the most recent turns of a chat that fit into a token budget.
+
+    The system prompt, the rolling summary (if any) and the latest user turn
+    are always kept; older turns are added newest-first until either the
+    token budget or the message cap would be exceeded.
+    """
+
+    def __init__(
+        self,
+        system_prompt: str,
+        max_tokens: int,
+        max_messages: int,
+        encoding_name: str = "cl100k_base"
+    ):
+        self.system_prompt = system_prompt
+        self.max_tokens = max_tokens
+        self.max_messages = max_messages
+        self.encoding_name = encoding_name
+
+    def count(self, message: dict) -> int:
+        return count_tokens(message["content"], self.encoding_name) + MESSAGE_OVERHEAD_TOKENS
+
+    def build(self, history: list[dict], summary: str | None = None) -> PromptContext:
+        preamble = [{"role": "system", "content": self.system_prompt}]
+        if summary:
+            preamble.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation:\n{summary}"
+            })
+        if not history:
+            return PromptContext(preamble, sum(map(self.count, preamble)), 0, 0)
+
+        *earlier, latest = history
+        used = sum(map(self.count, preamble)) + self.count(latest)
+        kept: list[dict] = []
+
+        for message in reversed(earlier):
+            if len(kept) + 1 >= self.max_messages:
+                break
+            tokens = self.count(message)
+            if used + tokens > self.max_tokens:
+                break
+            kept.append(message)
+            used += tokens
+
+        dropped = earlier[:len(earlier) - len(kept)]
+        return PromptContext(
+            messages=[*preamble, *reversed(kept), latest],
+            prompt_tokens=used,
+            dropped_messages=len(dropped),
+            dropped_tokens=sum(self.count(m) for m in dropped)
+        )
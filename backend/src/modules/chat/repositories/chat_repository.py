@@ -1,35 +1,117 @@
 from uuid import UUID
 from typing import List
+from supabase import AsyncClient
+from src.core import config
+from src.core.db import Database
+from src.common.tracing import traced
+from src.modules.chat.repositories.history_cache import HistoryCache
+from src.modules.chat.repositories.message_write_behind import MessageWriteBehind
 
 class ChatRepository:
-    def __init__(self, supabase):
-        self.supabase = supabase
+    def __init__(
+        self,
+        db: Database,
+        history_cache: HistoryCache | None = None,
+        write_behind: MessageWriteBehind | None = None
+    ):
+        self.db = db
+        self.history_cache = history_cache or HistoryCache(
+            max_chats=config.history_cache_size,
+            ttl=config.history_cache_ttl
+        )
+        self.write_behind = write_behind
+        if write_behind is not None:
+            # A dropped row was already appended to the cached history
+            write_behind.on_drop = self.history_cache.invalidate
 
-    def create_chat(self, user_id: UUID, title: str) -> dict:
-        res = self.supabase.table("ai_chats").insert({
+    @property
+    def supabase(self) -> AsyncClient:
+        return self.db.client
+
+    @traced("repo.create_chat")
+    async def create_chat(self, user_id: UUID, title: str) -> dict:
+        res = await self.supabase.table("ai_chats").insert({
             "user_id": str(user_id),
             "title": title
         }).execute()
-        return res.data[0]
+        chat = res.data[0]
+        # A brand-new chat has no history, so later writes can go straight to the cache
+        self.history_cache.put(str(chat["id"]), [])
+        return chat
+
+    @traced("repo.update_title")
+    async def update_title(self, chat_id: UUID, title: str) -> None:
+        await self.supabase.table("ai_chats") \
+            .update({"title": title}) \
+            .eq("id", str(chat_id)) \
+            .execute()
 
-    def add_message(self, chat_id: UUID, role: str, content: str) -> dict:
-        res = self.supabase.table("ai_chat_messages").insert({
+    @traced("repo.add_message")
+    async def add_message(self, chat_id: UUID, role: str, content: str) -> dict:
+        row = {
             "chat_id": str(chat_id),
             "role": role,
             "content": content
-        }).execute()
-        return res.data[0]
+        }
+        if self.write_behind is not None:
+            message = self.write_behind.enqueue(row)
+        else:
+            try:
+                res = await self.supabase.table("ai_chat_messages").insert(row).execute()
+            except BaseException:
+                # The insert may still have landed (e.g. on a timeout), so
+                # the cached history can no longer be trusted either way
+                self.history_cache.invalidate(str(chat_id))
+                raise
+            message = res.data[0]
+        self.history_cache.append(str(chat_id), message)
+        return message
 
-    def get_messages(self, chat_id: UUID) -> List[dict]:
-        res = self.supabase.table("ai_chat_messages") \
-            .select("*") \
+    @traced("repo.get_messages")
+    async def get_messages(self, chat_id: UUID) -> List[dict]:
+        cached = self.history_cache.get(str(chat_id))
+        if cached is not None:
+            return cached
+
+        token = self.history_cache.begin_fill(str(chat_id))
+        try:
+            # Snapshot buffered rows before reading, so a flush that lands during
+            # the read cannot make a row invisible to both sources
+            pending = self.write_behind.pending(str(chat_id)) if self.write_behind else []
+            res = await self.supabase.table("ai_chat_messages") \
+                .select("*") \
+                .eq("chat_id", str(chat_id)) \
+                .order("created_at") \
+                .execute()
+            stored_ids = {m["id"] for m in res.data}
+            messages = res.data + [m for m in pending if m["id"] not in stored_ids]
+            self.history_cache.fill(str(chat_id), messages, token)
+            return messages
+        finally:
+            self.history_cache.abandon_fill(str(chat_id), token)
+
+    @traced("repo.get_summary")
+    async def get_summary(self, chat_id: UUID) -> dict | None:
+        res = await self.supabase.table("ai_chat_summaries") \
+            .select("summary, message_count") \
             .eq("chat_id", str(chat_id)) \
-            .order("created_at") \
+            .maybe_single() \
+            .execute()
+        return res.data if res else None
+
+    @traced("repo.save_summary")
+    async def save_summary(self, chat_id: UUID, summary: str, message_count: int) -> None:
+        await self.supabase.table("ai_chat_summaries") \
+            .upsert({
+                "chat_id": str(chat_id),
+                "summary": summary,
+                "message_count": message_count
+            }, on_conflict="chat_id") \
             .execute()
-        return res.data
 
-    def get_chat(self, chat_id: UUID, user_id: UUID) -> dict:
-        res = self.supabase.table("ai_chats") \
+    @traced("repo.get_chat")
+    async def get_chat(self, chat_id: UUID, user_id: UUID) -> dict:
+        res = await self.supabase.table("ai_chats") \
             .select("*") \
             .eq("id", str(chat_id)) \
             .eq("user_id", str(user_id)) \
@@ -37,8 +119,9 @@ class ChatRepository:
             .execute()
         return res.data
 
-    def list_chats(self, user_id: UUID) -> List[dict]:
-        res = self.supabase.table("ai_chats") \
+    @traced("repo.list_chats")
+    async def list_chats(self, user_id: UUID) -> List[dict]:
+        res = await self.supabase.table("ai_chats") \
             .select("id, title, created_at, updated_at") \
             .eq("user_id", str(user_id)) \
             .order("updated_at", desc=True) \
@@ -1,14 +1,24 @@
-from src.core.db import supabase
+import copy
 from uuid import UUID
+from cachetools import TTLCache
+from supabase import AsyncClient
+from src.core.db import Database
 import json, base64
 from Crypto.Cipher import AES
 from Crypto.Util.Padding import pad, unpad
 from os import getenv
+from functools import lru_cache
 
-SECRET_KEY = base64.b64decode(getenv("GOOGLE_CREDENTIALS_KEY"))
+@lru_cache()
+def _secret_key() -> bytes:
+    # Read lazily so a missing key only breaks credential storage, not boot
+    key = getenv("GOOGLE_CREDENTIALS_KEY")
+    if not key:
+        raise RuntimeError("GOOGLE_CREDENTIALS_KEY is not set")
+    return base64.b64decode(key)
 
 def encrypt_data(data: dict) -> str:
-    cipher = AES.new(SECRET_KEY, AES.MODE_CBC)
+    cipher = AES.new(_secret_key(), AES.MODE_CBC)
     ct_bytes = cipher.encrypt(pad(json.dumps(data).encode(), AES.block_size))
     return base64.b64encode(cipher.iv + ct_bytes).decode()
 
@@ -16,30 +26,56 @@ def decrypt_data(enc_str: str) -> dict:
     raw = base64.b64decode(enc_str)
     iv = raw[:16]
     ct = raw[16:]
-    cipher = AES.new(SECRET_KEY, AES.MODE_CBC, iv)
+    cipher = AES.new(_secret_key(), AES.MODE_CBC, iv)
     return json.loads(unpad(cipher.decrypt(ct), AES.block_size).decode())
 
 class GoogleCredentialsRepository:
-    def get_credentials(self, user_id: UUID) -> dict | None:
-        res = supabase.table("google_credentials") \
+    def __init__(self, db: Database, cache_size: int = 1024, cache_ttl: float = 60):
+        self.db = db
+        # Decrypted credentials are held briefly so repeated lookups skip the
+        # round-trip and the AES work. save_credentials drops the entry and
+        # bumps the user's generation, so a read that was already in flight
+        # does not cache the old credentials again.
+        self._cache: TTLCache[str, dict] = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._generations: dict[str, int] = {}
+
+    @property
+    def supabase(self) -> AsyncClient:
+        return self.db.client
+
+    async def get_credentials(self, user_id: UUID) -> dict | None:
+        key = str(user_id)
+        cached = self._cache.get(key)
+        if cached is not None:
+            # A copy, so callers cannot change what later lookups get
+            return copy.deepcopy(cached)
+        generation = self._generations.get(key, 0)
+
+        res = await self.supabase.table("google_credentials") \
             .select("credentials") \
             .eq("user_id", str(user_id)) \
-            .single() \
+            .maybe_single() \
             .execute()
-        if not res.data:
+        if not res or not res.data:
             return None
-        return decrypt_data(res.data["credentials"])
+        credentials = decrypt_data(res.data["credentials"])
+        if self._generations.get(key, 0) == generation:
+            self._cache[key] = copy.deepcopy(credentials)
+        return credentials
 
-    def save_credentials(self, user_id: UUID, credentials: dict):
+    async def save_credentials(self, user_id: UUID, credentials: dict):
         enc = encrypt_data(credentials)
-        supabase.table("google_credentials") \
+        await self.supabase.table("google_credentials") \
             .upsert({"user_id": str(user_id), "credentials": enc}, on_conflict="user_id") \
             .execute()
+        key = str(user_id)
+        self._generations[key] = self._generations.get(key, 0) + 1
+        self._cache.pop(key, None)
 
-    def has_credentials(self, user_id: UUID) -> bool:
-        res = supabase.table("google_credentials") \
+    async def has_credentials(self, user_id: UUID) -> bool:
+        res = await self.supabase.table("google_credentials") \
             .select("credentials") \
             .eq("user_id", str(user_id)) \
-            .single() \
+            .maybe_single() \
             .execute()
-        return bool(res.data)
+        return bool(res and res.data)
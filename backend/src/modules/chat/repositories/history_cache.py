@@ -0,0 +1,57 @@
+from cachetools import TTLCache
+
+class HistoryCache:
+    """Size-bounded LRU of recent per-chat message lists.
+
+    Entries are written through on every new message and expire after `ttl`
+    seconds, which bounds staleness when another worker writes to the same
+    chat. A database read only populates the cache if no write to that chat
+    happened while it was in flight, so a slow read can never overwrite a
+    newer write-through entry.
+    """
+
+    def __init__(self, max_chats: int, ttl: float):
+        self._entries: TTLCache[str, list[dict]] = TTLCache(maxsize=max_chats, ttl=ttl)
+        self._pending_fills: dict[str, object] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, chat_id: str) -> list[dict] | None:
+        messages = self._entries.get(chat_id)
+        if messages is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return list(messages)
+
+    def begin_fill(self, chat_id: str) -> object:
+        token = object()
+        self._pending_fills[chat_id] = token
+        return token
+
+    def fill(self, chat_id: str, messages: list[dict], token: object) -> None:
+        if self._pending_fills.get(chat_id) is token:
+            del self._pending_fills[chat_id]
+            self._entries[chat_id] = list(messages)
+
+    def abandon_fill(self, chat_id: str, token: object) -> None:
+        """Forget a fill that will not happen, e.g. because the read failed."""
+        if self._pending_fills.get(chat_id) is token:
+            del self._pending_fills[chat_id]
+
+    def put(self, chat_id: str, messages: list[dict]) -> None:
+        self._pending_fills.pop(chat_id, None)
+        self._entries[chat_id] = list(messages)
+
+    def append(self, chat_id: str, message: dict) -> None:
+        self._pending_fills.pop(chat_id, None)
+        messages = self._entries.get(chat_id)
+        if messages is not None:
+            messages.append(message)
+
+    def invalidate(self, chat_id: str) -> None:
+        self._pending_fills.pop(chat_id, None)
+        self._entries.pop(chat_id, None)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
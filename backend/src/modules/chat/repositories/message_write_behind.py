@@ -0,0 +1,175 @@
+import asyncio
+import logging
+from typing import Callable
+from uuid import uuid4
+from datetime import datetime, timezone
+from postgrest.exceptions import APIError
+from src.core.db import Database
+from src.common.metrics import WRITE_BEHIND_DROPPED
+
+logger = logging.getLogger(__name__)
+
+class MessageWriteBehind:
+    """Buffer message inserts and flush them to the database in batches.
+
+    Rows get their `id` and `created_at` on enqueue, so callers can return
+    them immediately and later reads can merge still-pending rows with the
+    database result (read-your-writes). A batch is flushed once it reaches
+    `batch_size` rows or `flush_interval` seconds after its first row.
+    Flushes are upserts on `id`, which makes retries idempotent.
+
+    A flush that fails for a transient reason (network, timeout, database
+    down) is retried with capped exponential backoff for as long as it takes;
+    its rows stay pending, and so visible to reads, meanwhile. When the
+    database rejects the rows themselves (e.g. a foreign key to a chat that
+    no longer exists) the batch is bisected until the offending rows are
+    isolated; those are logged and dropped so they cannot hold up the rows
+    queued behind them, and `on_drop` is called with each affected chat id.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        table: str = "ai_chat_messages",
+        batch_size: int = 50,
+        flush_interval: float = 0.2,
+        max_backoff: float = 30.0,
+        stop_timeout: float = 10.0
+    ):
+        self.db = db
+        self.table = table
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        self.stop_timeout = stop_timeout
+        self._queue: asyncio.Queue[dict | None] = asyncio.Queue()
+        self._pending: dict[str, list[dict]] = {}
+        self._task: asyncio.Task | None = None
+        self.on_drop: Callable[[str], None] | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush everything that is still buffered; called on graceful shutdown.
+
+        Gives up after `stop_timeout` seconds if the database is unreachable,
+        so shutdown cannot hang; whatever is still pending then is lost.
+        """
+        if self._task is None:
+            return
+        self._queue.put_nowait(None)
+        try:
+            await asyncio.wait_for(self._task, self.stop_timeout)
+        except asyncio.TimeoutError:
+            lost = [row for rows in self._pending.values() for row in rows]
+            WRITE_BEHIND_DROPPED.labels(reason="shutdown").inc(len(lost))
+            logger.error(
+                "Shutting down with %d unflushed messages: %s",
+                len(lost), ", ".join(row["id"] for row in lost)
+            )
+        self._task = None
+
+    def enqueue(self, row: dict) -> dict:
+        row = {
+            "id": str(uuid4()),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            **row
+        }
+        self._pending.setdefault(row["chat_id"], []).append(row)
+        self._queue.put_nowait(row)
+        return row
+
+    def pending(self, chat_id: str) -> list[dict]:
+        return list(self._pending.get(chat_id, ()))
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+
+            batch = [first]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if row is None:
+                    stopping = True
+                    break
+                batch.append(row)
+
+            await self._flush(batch)
+
+        remaining = []
+        while not self._queue.empty():
+            row = self._queue.get_nowait()
+            if row is not None:
+                remaining.append(row)
+        for i in range(0, len(remaining), self.batch_size):
+            await self._flush(remaining[i:i + self.batch_size])
+
+    @staticmethod
+    def _is_rejected(error: Exception) -> bool:
+        # SQLSTATE classes 22 (data exception) and 23 (integrity violation)
+        # mean the rows are bad; retrying them can never succeed.
+        return isinstance(error, APIError) and (error.code or "")[:2] in ("22", "23")
+
+    async def _write(self, batch: list[dict]) -> APIError | None:
+        """Upsert `batch`, retrying transient errors until it succeeds.
+
+        Returns the error if the database rejected the rows, else None.
+        """
+        delay = 0.1
+        attempt = 1
+        while True:
+            try:
+                await self.db.client.table(self.table) \
+                    .upsert(batch, on_conflict="id", ignore_duplicates=True) \
+                    .execute()
+                return None
+            except Exception as error:
+                if self._is_rejected(error):
+                    return error
+                logger.warning(
+                    "Failed to flush %d buffered messages (attempt %d), retrying in %.1fs: %s",
+                    len(batch), attempt, delay, error
+                )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_backoff)
+            attempt += 1
+
+    async def _flush(self, batch: list[dict]) -> None:
+        error = await self._write(batch)
+        if error is not None and len(batch) > 1:
+            middle = len(batch) // 2
+            await self._flush(batch[:middle])
+            await self._flush(batch[middle:])
+            return
+
+        if error is not None:
+            row = batch[0]
+            WRITE_BEHIND_DROPPED.labels(reason="rejected").inc()
+            logger.error(
+                "Dropping buffered message %s in chat %s rejected by the database: %s %s",
+                row["id"], row["chat_id"], error.code, error.message
+            )
+            if self.on_drop is not None:
+                self.on_drop(row["chat_id"])
+
+        for row in batch:
+            pending = self._pending.get(row["chat_id"])
+            if pending is None:
+                continue
+            pending.remove(row)
+            if not pending:
+                del self._pending[row["chat_id"]]
@@ -0,0 +1,159 @@
+import re
+import time
+import zlib
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+import numpy as np
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Function words a rephrasing may add, drop or swap. Negations are not in
+# here on purpose: "is X safe" and "is X not safe" must never match.
+_STOPWORDS = frozenset("""
+a an the this that these those is are was were be been being am do does did
+what whats which who whom how can could would should will shall may might
+i me my you your we our it its of in on at by for with about to from into
+please tell show give explain me some any there here and or
+s re ve ll d m
+""".split())
+
+def normalize_prompt(text: str) -> str:
+    return " ".join(text.lower().split()).rstrip(" ?!.")
+
+def content_signature(text: str) -> tuple[str, ...]:
+    """The prompt's content words in order: numbers, names, negations and so on.
+
+    The embedding ignores word order and cannot tell numbers or names
+    apart, so a similarity hit additionally requires this to match exactly.
+    """
+    return tuple(word for word in _WORD_RE.findall(text) if word not in _STOPWORDS)
+
+def embed(text: str, dim: int) -> np.ndarray:
+    """Feature-hashed bag of words and character trigrams, L2-normalised.
+
+    Cheap enough to compute on the request path, but blind to word order
+    and to which number or name was used; see `content_signature`.
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    words = _WORD_RE.findall(text)
+    for word in words:
+        vector[zlib.crc32(word.encode()) % dim] += 1.0
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            vector[zlib.crc32(padded[i:i + 3].encode()) % dim] += 0.5
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+@dataclass
+class _Entry:
+    namespace: str
+    signature: tuple[str, ...]
+    embedding: np.ndarray
+    answer: str
+    expires_at: float
+
+class ResponseCache:
+    """Two-tier cache of final agent answers.
+
+    The exact tier is keyed by the normalised prompt plus the model and a hash
+    of the system prompt. The optional similarity tier only considers entries
+    in the same model/system-prompt namespace whose content words match
+    exactly and in the same order; those are looked up by that signature in
+    O(1) and the most similar one above `similarity_threshold` (cosine of
+    the embeddings) wins. It absorbs rephrasings in filler words and
+    punctuation but never a different number, name or negation, and is
+    disabled when `similarity_threshold` is None. Entries expire after `ttl`
+    seconds and the least recently used ones are evicted once `max_entries`
+    is reached.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, similarity_threshold: float | None, dim: int = 512):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.dim = dim
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        # (namespace, signature) -> keys of the entries sharing it
+        self._by_signature: dict[tuple[str, tuple[str, ...]], set[str]] = {}
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _namespace(model: str, system_prompt: str) -> str:
+        return f"{model}:{hashlib.sha256(system_prompt.encode()).hexdigest()[:16]}"
+
+    @staticmethod
+    def _key(namespace: str, prompt: str) -> str:
+        return hashlib.sha256(f"{namespace}\n{prompt}".encode()).hexdigest()
+
+    def _evict(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        group = self._by_signature[(entry.namespace, entry.signature)]
+        group.discard(key)
+        if not group:
+            del self._by_signature[(entry.namespace, entry.signature)]
+
+    def _search(self, namespace: str, signature: tuple[str, ...], embedding: np.ndarray, now: float) -> str | None:
+        if self.similarity_threshold is None:
+            return None
+        best_key, best_score = None, self.similarity_threshold
+        for key in self._by_signature.get((namespace, signature), ()):
+            entry = self._entries[key]
+            if entry.expires_at <= now:
+                continue
+            score = float(entry.embedding @ embedding)
+            if score >= best_score:
+                best_key, best_score = key, score
+        return best_key
+
+    def get(self, model: str, system_prompt: str, prompt: str) -> str | None:
+        now = time.monotonic()
+        namespace = self._namespace(model, system_prompt)
+        normalized = normalize_prompt(prompt)
+
+        key = self._key(namespace, normalized)
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= now:
+            self._evict(key)
+            entry = None
+        if entry is not None:
+            self.exact_hits += 1
+        else:
+            key = self._search(namespace, content_signature(normalized), embed(normalized, self.dim), now)
+            if key is None:
+                self.misses += 1
+                return None
+            entry = self._entries[key]
+            self.semantic_hits += 1
+
+        self._entries.move_to_end(key)
+        return entry.answer
+
+    def set(self, model: str, system_prompt: str, prompt: str, answer: str) -> None:
+        namespace = self._namespace(model, system_prompt)
+        normalized = normalize_prompt(prompt)
+        key = self._key(namespace, normalized)
+
+        if key in self._entries:
+            self._evict(key)
+        signature = content_signature(normalized)
+        self._entries[key] = _Entry(
+            namespace=namespace,
+            signature=signature,
+            embedding=embed(normalized, self.dim),
+            answer=answer,
+            expires_at=time.monotonic() + self.ttl
+        )
+        self._by_signature.setdefault((namespace, signature), set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._evict(next(iter(self._entries)))
+
+    def stats(self) -> dict:
+        return {
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "size": len(self._entries)
+        }
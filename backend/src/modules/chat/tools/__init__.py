@@ -1,3 +1,29 @@
-from src.modules.chat.tools.web_search_tool import web_search_tool
+import logging
+from uuid import UUID
+from langchain_core.tools import BaseTool
+from src.modules.chat.tools.registry import ToolRegistry
+from src.modules.chat.tools.web_search_tool import build_web_search_tool
+from src.modules.chat.tools.google_calendar_tool import calendar_tool_pool
 
-__all__ = ["web_search_tool"]
+logger = logging.getLogger(__name__)
+
+tool_registry = ToolRegistry()
+tool_registry.register("web_search", build_web_search_tool)
+
+async def resolve_tool_groups(user_id: UUID | None) -> dict[str, list[BaseTool]]:
+    """Return the tools available to a user, grouped by kind.
+
+    Shared tools are keyed by their registry name; the user's Calendar tools
+    (if they have stored credentials) are grouped under "calendar".
+    """
+    groups = {}
+    for name in tool_registry.names:
+        try:
+            groups[name] = [await tool_registry.aget(name)]
+        except Exception:
+            logger.exception("Tool %s is unavailable", name)
+    if user_id is not None:
+        groups["calendar"] = await calendar_tool_pool.get_tools(user_id)
+    return groups
+
+__all__ = ["tool_registry", "resolve_tool_groups"]
@@ -0,0 +1,75 @@
+import json
+from typing import Any
+from cachetools import TTLCache
+from pydantic import PrivateAttr
+from langchain_core.tools import BaseTool
+from src.common.concurrency import run_in_thread, SingleFlight
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+def _result_size(result: Any) -> int:
+    return len(json.dumps(result, default=str))
+
+class CachedSearchTool(BaseTool):
+    """Wrap a search tool with a TTL cache and single-flight deduplication.
+
+    Results are keyed by the normalised query and bounded by their serialised
+    size (`max_bytes`). Identical searches that arrive while one is already
+    running wait for that request instead of hitting the backend again.
+    """
+
+    inner: BaseTool
+    _cache: TTLCache = PrivateAttr()
+    _flights: SingleFlight = PrivateAttr()
+    _stats: dict = PrivateAttr()
+
+    def __init__(self, inner: BaseTool, ttl: float, max_bytes: int):
+        super().__init__(
+            name=inner.name,
+            description=inner.description,
+            args_schema=inner.args_schema,
+            inner=inner,
+        )
+        self._cache = TTLCache(maxsize=max_bytes, ttl=ttl, getsizeof=_result_size)
+        self._flights = SingleFlight()
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0}
+
+    def _store(self, key: str, result: Any) -> None:
+        try:
+            self._cache[key] = result
+        except ValueError:
+            # Larger than the whole cache; serve it but do not keep it
+            pass
+
+    def _run(self, query: str, **kwargs: Any) -> Any:
+        key = _normalize_query(query)
+        if key in self._cache:
+            self._stats["hits"] += 1
+            return self._cache[key]
+
+        self._stats["misses"] += 1
+        result = self.inner.invoke({"query": query})
+        self._store(key, result)
+        return result
+
+    async def _arun(self, query: str, **kwargs: Any) -> Any:
+        key = _normalize_query(query)
+        if key in self._cache:
+            self._stats["hits"] += 1
+            return self._cache[key]
+
+        if self._flights.in_flight(key):
+            self._stats["coalesced"] += 1
+        else:
+            self._stats["misses"] += 1
+
+        async def search() -> Any:
+            result = await run_in_thread(self.inner.invoke, {"query": query})
+            self._store(key, result)
+            return result
+
+        return await self._flights.do(key, search)
+
+    def stats(self) -> dict:
+        return {**self._stats, "size_bytes": self._cache.currsize}
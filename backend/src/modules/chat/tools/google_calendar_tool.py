@@ -1,7 +1,106 @@
-from langchain_google_community import CalendarToolkit
+import logging
+from uuid import UUID
+from cachetools import TTLCache
+from langchain_core.tools import BaseTool
+from src.core import config, db
+from src.common.concurrency import run_in_thread, SingleFlight
+from src.modules.chat.repositories.google_credentials_repository import GoogleCredentialsRepository
 
-# Assuming credentials.json is in the same directory or configured properly
-toolkit = CalendarToolkit()
+logger = logging.getLogger(__name__)
 
-# Get all available tools
-google_calendar_tools = toolkit.get_tools()
+SCOPES = ["https://www.googleapis.com/auth/calendar"]
+
+def _import_google_clients():
+    # The Google API client stack is slow to import, so it is loaded on the
+    # first build (or by the startup warm-up) rather than at app import.
+    import httplib2
+    import google_auth_httplib2
+    from google.oauth2.credentials import Credentials
+    from googleapiclient.discovery import build
+    from googleapiclient.http import HttpRequest
+    from langchain_google_community import CalendarToolkit
+    return httplib2, google_auth_httplib2, Credentials, build, HttpRequest, CalendarToolkit
+
+def build_calendar_tools(credentials_info: dict) -> list[BaseTool]:
+    httplib2, google_auth_httplib2, Credentials, build, HttpRequest, CalendarToolkit = _import_google_clients()
+    credentials = Credentials.from_authorized_user_info(credentials_info, scopes=SCOPES)
+
+    # httplib2.Http is not thread-safe and tool calls run concurrently on the
+    # thread pool, so every request gets its own transport.
+    def build_request(_http, *args, **kwargs):
+        http = google_auth_httplib2.AuthorizedHttp(credentials, http=httplib2.Http())
+        return HttpRequest(http, *args, **kwargs)
+
+    service = build(
+        "calendar",
+        "v3",
+        http=google_auth_httplib2.AuthorizedHttp(credentials, http=httplib2.Http()),
+        requestBuilder=build_request,
+        cache_discovery=False,
+    )
+    return CalendarToolkit(api_resource=service).get_tools()
+
+class CalendarToolPool:
+    """Per-user Google Calendar tools, built from the user's stored credentials.
+
+    Built tool sets (and the discovery-based service object behind them) are
+    kept in a bounded TTL cache, so a user's tools are built once and reused
+    across tool calls and requests. Users without credentials get an empty
+    tool set, which is cached as well. A failed build (a Google or database
+    error) is only remembered for `failure_ttl` seconds, so a transient
+    error does not switch the user's calendar tools off for the full `ttl`.
+
+    `invalidate` bumps the user's generation; a build that started before it
+    is still returned to its callers but not cached, so it cannot bring back
+    tools built from replaced credentials.
+    """
+
+    def __init__(self, credentials_repo: GoogleCredentialsRepository, max_users: int, ttl: float, failure_ttl: float = 30):
+        self.credentials_repo = credentials_repo
+        self._tools: TTLCache[str, list[BaseTool]] = TTLCache(maxsize=max_users, ttl=ttl)
+        self._failures: TTLCache[str, bool] = TTLCache(maxsize=max_users, ttl=failure_ttl)
+        self._generations: dict[str, int] = {}
+        self._flights = SingleFlight()
+
+    async def get_tools(self, user_id: UUID) -> list[BaseTool]:
+        key = str(user_id)
+        tools = self._tools.get(key)
+        if tools is not None:
+            return tools
+        if key in self._failures:
+            return []
+        generation = self._generations.get(key, 0)
+        # Keyed by generation too, so callers after an invalidate never join
+        # a build that is still using the old credentials
+        return await self._flights.do((key, generation), lambda: self._build(user_id, generation))
+
+    async def _build(self, user_id: UUID, generation: int) -> list[BaseTool]:
+        key = str(user_id)
+        try:
+            credentials_info = await self.credentials_repo.get_credentials(user_id)
+            tools = await run_in_thread(build_calendar_tools, credentials_info) if credentials_info else []
+        except Exception:
+            logger.warning("user %s: could not build Google Calendar tools", user_id, exc_info=True)
+            if self._generations.get(key, 0) == generation:
+                self._failures[key] = True
+            return []
+
+        if self._generations.get(key, 0) == generation:
+            self._tools[key] = tools
+        return tools
+
+    async def warm_up(self) -> None:
+        await run_in_thread(_import_google_clients)
+
+    def invalidate(self, user_id: UUID) -> None:
+        key = str(user_id)
+        self._generations[key] = self._generations.get(key, 0) + 1
+        self._tools.pop(key, None)
+        self._failures.pop(key, None)
+
+calendar_tool_pool = CalendarToolPool(
+    GoogleCredentialsRepository(db, cache_ttl=config.google_credentials_cache_ttl),
+    max_users=config.calendar_pool_size,
+    ttl=config.calendar_pool_ttl,
+    failure_ttl=config.calendar_pool_failure_ttl
+)
@@ -0,0 +1,49 @@
+import logging
+import threading
+from typing import Callable
+from langchain_core.tools import BaseTool
+from src.common.concurrency import run_in_thread
+
+logger = logging.getLogger(__name__)
+
+class ToolRegistry:
+    """Declares the shared tools up front and builds each one on first use.
+
+    Factories run at most once; `warm_up` builds everything on the thread
+    pool after startup so the first request rarely pays the construction
+    cost, and a tool that fails to build is logged instead of breaking boot.
+    """
+
+    def __init__(self):
+        self._factories: dict[str, Callable[[], BaseTool]] = {}
+        self._tools: dict[str, BaseTool] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: Callable[[], BaseTool]) -> None:
+        self._factories[name] = factory
+
+    @property
+    def names(self) -> list[str]:
+        return list(self._factories)
+
+    def get(self, name: str) -> BaseTool:
+        tool = self._tools.get(name)
+        if tool is None:
+            with self._lock:
+                tool = self._tools.get(name)
+                if tool is None:
+                    tool = self._tools[name] = self._factories[name]()
+        return tool
+
+    async def aget(self, name: str) -> BaseTool:
+        tool = self._tools.get(name)
+        if tool is not None:
+            return tool
+        return await run_in_thread(self.get, name)
+
+    async def warm_up(self) -> None:
+        for name in self._factories:
+            try:
+                await self.aget(name)
+            except Exception:
+                logger.exception("Failed to build tool %s", name)
@@ -0,0 +1,74 @@
+import re
+import logging
+from langchain_core.tools import BaseTool
+
+logger = logging.getLogger(__name__)
+
+# Keyword patterns per tool group (English and Polish). A group is bound when
+# the latest user message matches its pattern.
+GROUP_PATTERNS: dict[str, re.Pattern] = {
+    "web_search": re.compile(
+        r"\b(search|look ?up|google|find|news|latest|recent|current|today'?s|price|cost|weather|"
+        r"who (is|won|was)|what happened|release|version|update|score|stock|"
+        r"wyszukaj|znajdź|szukaj|wiadomości|najnowsze|aktualn\w*|cena|pogoda)\b"
+        r"|https?://|\b20\d\d\b",
+        re.IGNORECASE
+    ),
+    "calendar": re.compile(
+        r"\b(calendar|event|meeting|schedule|reschedule|appointment|remind\w*|agenda|busy|free slot|"
+        r"tomorrow|tonight|next (week|month)|monday|tuesday|wednesday|thursday|friday|saturday|sunday|"
+        r"\d{1,2}(:\d\d)? ?(am|pm)|"
+        r"kalendarz\w*|spotkani\w*|wydarzeni\w*|termin\w*|przypomnij|jutro|poniedziałek|wtorek|"
+        r"środ\w*|czwartek|piątek|sobot\w*|niedziel\w*)\b",
+        re.IGNORECASE
+    ),
+}
+
+SMALL_TALK = re.compile(
+    r"^\s*(hi|hello|hey|thanks|thank you|ok|okay|bye|cześć|hej|dzięki|dziękuję|siema)\b[\s!.,]*$",
+    re.IGNORECASE
+)
+
+def _content(message) -> str:
+    content = message["content"] if isinstance(message, dict) else message.content
+    return content if isinstance(content, str) else ""
+
+def _tool_calls(message) -> list[dict]:
+    if isinstance(message, dict):
+        return message.get("tool_calls") or []
+    return getattr(message, "tool_calls", None) or []
+
+def _latest_user_message(messages: list) -> str:
+    for message in reversed(messages):
+        role = message["role"] if isinstance(message, dict) else message.type
+        if role in ("user", "human"):
+            return _content(message)
+    return ""
+
+def select_tool_groups(
+    messages: list,
+    groups: dict[str, list[BaseTool]],
+    fallback: tuple[str, ...] = ("web_search",)
+) -> set[str]:
+    """Pick the tool groups worth binding for this turn.
+
+    Groups whose keywords match the latest user message are selected, plus
+    any group that already has a tool call in the conversation. If nothing
+    matches, `fallback` groups are bound, except for plain small talk which
+    gets no tools at all.
+    """
+    text = _latest_user_message(messages)
+    selected = {name for name in groups if name in GROUP_PATTERNS and GROUP_PATTERNS[name].search(text)}
+
+    used = {call["name"] for message in messages for call in _tool_calls(message)}
+    selected |= {name for name, tools in groups.items() if any(tool.name in used for tool in tools)}
+
+    if not selected and not SMALL_TALK.match(text):
+        selected = {name for name in fallback if name in groups}
+    return selected
+
+def select_tools(messages: list, groups: dict[str, list[BaseTool]], fallback: tuple[str, ...] = ("web_search",)) -> dict[str, BaseTool]:
+    selected = select_tool_groups(messages, groups, fallback)
+    tools = {tool.name: tool for name in groups if name in selected for tool in groups[name]}
+    logger.info("Selected tool groups %s (%d tools)", sorted(selected) or "none", len(tools))
+    return tools
@@ -1,6 +1,17 @@
-from langchain_community.tools import DuckDuckGoSearchResults
+from src.core.config import config
+from src.common.metrics import cache_stats
+from src.modules.chat.tools.cached_search_tool import CachedSearchTool
 
-web_search_tool = DuckDuckGoSearchResults(
-    output_format="list",
-    max_results=5
-)
+def build_web_search_tool() -> CachedSearchTool:
+    from langchain_community.tools import DuckDuckGoSearchResults
+
+    tool = CachedSearchTool(
+        DuckDuckGoSearchResults(
+            output_format="list",
+            max_results=5
+        ),
+        ttl=config.web_search_cache_ttl,
+        max_bytes=config.web_search_cache_max_bytes
+    )
+    cache_stats.register("web_search", tool.stats, {"hit": "hits", "miss": "misses", "coalesced": "coalesced"})
+    return tool
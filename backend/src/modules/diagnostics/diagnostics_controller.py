@@ -0,0 +1,28 @@
+import time
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from src.core import config
+from src.common.diagnostics import format_collapsed, profiler
+from src.modules.auth.dependencies import require_admin
+
+class DiagnosticsController:
+    def __init__(self):
+        self.router = APIRouter(dependencies=[Depends(require_admin)])
+        self._routes()
+
+    def _routes(self):
+        self.router.get("/profile", include_in_schema=False)(self.profile)
+
+    async def profile(self, seconds: float = Query(10.0, gt=0)):
+        """Sample the worker for `seconds` and return collapsed stacks for a flamegraph."""
+        if not profiler.running:
+            raise HTTPException(status_code=503, detail="Profiler is disabled")
+        if seconds > config.profiler_max_seconds:
+            raise HTTPException(status_code=422, detail=f"seconds must be at most {config.profiler_max_seconds}")
+
+        samples = await profiler.capture(seconds)
+        filename = f"profile-{time.strftime('%Y%m%dT%H%M%S')}.collapsed"
+        return PlainTextResponse(
+            format_collapsed(samples),
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
@@ -0,0 +1,9 @@
+from fastapi import APIRouter
+from src.modules.diagnostics.diagnostics_controller import DiagnosticsController
+
+class DiagnosticsModule:
+    def __init__(self):
+        self.router = APIRouter()
+        self.router.include_router(DiagnosticsController().router, prefix="/admin", tags=["Diagnostics"])
+
+diagnostics_module = DiagnosticsModule()
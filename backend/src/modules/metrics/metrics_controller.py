@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+class MetricsController:
+    def __init__(self):
+        self.router = APIRouter()
+        self._routes()
+
+    def _routes(self):
+        self.router.get("/metrics", include_in_schema=False)(self.metrics)
+
+    async def metrics(self):
+        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
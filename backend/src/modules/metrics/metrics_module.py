@@ -0,0 +1,9 @@
+from fastapi import APIRouter
+from src.modules.metrics.metrics_controller import MetricsController
+
+class MetricsModule:
+    def __init__(self):
+        self.router = APIRouter()
+        self.router.include_router(MetricsController().router, tags=["Metrics"])
+
+metrics_module = MetricsModule()
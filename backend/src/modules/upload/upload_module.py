@@ -1,13 +1,11 @@
 from fastapi import APIRouter
-from src.core.db import supabase
 from src.modules.upload.upload_controller import UploadController
 from src.modules.upload.upload_service import UploadService
-from src.modules.chat.repositories.google_credentials_repository import GoogleCredentialsRepository
+from src.modules.chat.tools.google_calendar_tool import calendar_tool_pool
 
 class UploadModule:
     def __init__(self):
-        repo = GoogleCredentialsRepository(supabase)
-        service = UploadService(repo)
+        service = UploadService(calendar_tool_pool.credentials_repo, calendar_tool_pool)
         controller = UploadController(service)
         self.router = APIRouter()
         self.router.include_router(
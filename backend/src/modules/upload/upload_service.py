@@ -3,11 +3,13 @@ import json
 from fastapi import HTTPException, Response, UploadFile
 from fastapi.responses import RedirectResponse
 from src.modules.chat.repositories.google_credentials_repository import GoogleCredentialsRepository
+from src.modules.chat.tools.google_calendar_tool import CalendarToolPool
 from pydantic import ValidationError
 
 class UploadService:
-    def __init__(self, repo: GoogleCredentialsRepository):
+    def __init__(self, repo: GoogleCredentialsRepository, calendar_tool_pool: CalendarToolPool):
         self.repo = repo
+        self.calendar_tool_pool = calendar_tool_pool
 
     async def upload_google_credentials(self, file: UploadFile, user_id: UUID):
         if not file.filename.endswith(".json"):
@@ -18,5 +20,6 @@ class UploadService:
         except Exception:
             raise HTTPException(status_code=400, detail="Invalid JSON file")
 
-        self.repo.save_credentials(user_id, credentials)
+        await self.repo.save_credentials(user_id, credentials)
+        self.calendar_tool_pool.invalidate(user_id)
         return {"message": "Google credentials uploaded successfully"}
\ No newline at end of file
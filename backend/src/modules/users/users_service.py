@@ -1,11 +1,11 @@
 from fastapi import HTTPException
 from src.modules.users.users_schema import RetrieveUserResponseModel
-from src.core import supabase
+from src.core import db
 
 class UsersService:
     async def retrieve_user(self, token: str) -> RetrieveUserResponseModel:
         try:
-            response = supabase.auth.get_user(token)
+            response = await db.client.auth.get_user(token)
             if not response or response.user is None:
                 raise HTTPException(
                     status_code=400,
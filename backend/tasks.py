@@ -19,3 +19,8 @@ def test(c):
 def docs(c):
     """Run MkDocs server"""
     c.run("mkdocs serve")
+
+@task
+def bench(c, name="auth_benchmark"):
+    """Run a benchmark script from benchmarks/"""
+    c.run(f"python -m benchmarks.{name}")
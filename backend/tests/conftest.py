@@ -0,0 +1,79 @@
+import os
+import pytest
+from benchmarks.fake_openai_server import create_app, free_port, serve_in_background
+from tests.fakes import FakeChatRepository
+
+FAST_MODEL = "fake/fast"
+STRONG_MODEL = "fake/strong"
+FAKE_OPENAI_PORT = free_port()
+
+# Settings are read when `src` is first imported, so every model call has to
+# be pointed at the fake server before any test module is collected
+os.environ.update({
+    "OPENROUTER_URL": f"http://127.0.0.1:{FAKE_OPENAI_PORT}",
+    "OPENROUTER_API_KEY": "fake",
+    "FAST_MODELS": f'["{FAST_MODEL}"]',
+    "STRONG_MODELS": f'["{STRONG_MODEL}"]',
+    "SUPERVISOR_ENABLED": "false",
+    "RESPONSE_CACHE_ENABLED": "false",
+    "MESSAGE_WRITE_BEHIND": "false",
+})
+for name, value in {
+    "HOST": "127.0.0.1",
+    "PORT": "8000",
+    "BCRYPT_SALT_ROUNDS": "4",
+    "SUPABASE_URL": "http://127.0.0.1:9",
+    "SUPABASE_KEY": "test",
+    "SUPABASE_ANON_KEY": "test",
+    "SUPABASE_SERVICE_ROLE_KEY": "test",
+    "FRONTEND_URL": "http://localhost:3000",
+    "MAX_CHAT_HISTORY": "20",
+    "STREAM_TIMEOUT": "30",
+    "TITLE_GENERATION_PROMPT": "Generate a title.",
+    "ENCRYPT_KEY": "test",
+}.items():
+    os.environ.setdefault(name, value)
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture(scope="session")
+async def _fake_openai_app(anyio_backend):
+    # Async so that it keeps anyio's event loop alive for the rest of the
+    # session: the shared model clients pool connections on the loop they
+    # were first used on, and would fail on a fresh loop per test
+    app = create_app({}, default_latency=0.01)
+    server = serve_in_background(app, FAKE_OPENAI_PORT)
+    yield app
+    server.should_exit = True
+
+@pytest.fixture
+def fake_openai(_fake_openai_app):
+    """The fake OpenAI-compatible server, reset to fast answers after each test."""
+    app = _fake_openai_app
+    yield app
+    app.state.requests.clear()
+    app.state.latencies.clear()
+    app.state.errors.clear()
+    app.state.slow_tail.clear()
+    app.state.chunk_delay = 0.0
+
+@pytest.fixture
+def no_tools(monkeypatch):
+    """Run the main agent without tools, so no Calendar credentials are looked up."""
+    from src.modules.chat.agents import main_agent
+
+    async def resolve_tool_groups(user_id):
+        return {}
+    monkeypatch.setattr(main_agent, "resolve_tool_groups", resolve_tool_groups)
+
+@pytest.fixture
+def chat_repo():
+    return FakeChatRepository()
+
+@pytest.fixture
+def admission():
+    from src.common.concurrency import AdmissionController
+
+    return AdmissionController(max_concurrent=4, max_queue=4, queue_timeout=1.0, user_rate=100.0, user_burst=100)
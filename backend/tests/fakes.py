@@ -0,0 +1,38 @@
+import asyncio
+from uuid import uuid4
+
+class FakeChatRepository:
+    """An in-memory stand-in for `ChatRepository`."""
+
+    def __init__(self, messages: list[dict] | None = None, summary: dict | None = None):
+        self.messages = list(messages or [])
+        self.summary = summary
+        self.saved_summaries: list[tuple[str, int]] = []
+
+    async def get_messages(self, chat_id):
+        return list(self.messages)
+
+    async def add_message(self, chat_id, role: str, content: str) -> dict:
+        message = {"role": role, "content": content}
+        self.messages.append(message)
+        return message
+
+    async def get_summary(self, chat_id):
+        return self.summary
+
+    async def save_summary(self, chat_id, summary: str, message_count: int) -> None:
+        self.summary = {"summary": summary, "message_count": message_count}
+        self.saved_summaries.append((summary, message_count))
+
+    async def update_title(self, chat_id, title: str) -> None:
+        pass
+
+class FailingInsertRepository(FakeChatRepository):
+    """Creates chats but fails every message insert after a short delay."""
+
+    async def create_chat(self, user_id, title: str) -> dict:
+        return {"id": uuid4(), "title": title}
+
+    async def add_message(self, chat_id, role: str, content: str) -> dict:
+        await asyncio.sleep(0.01)
+        raise TimeoutError("insert timed out")
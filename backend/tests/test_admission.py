@@ -0,0 +1,54 @@
+import asyncio
+import threading
+import pytest
+from src.common.concurrency import AdmissionController, AdmissionRejected
+from src.modules.chat.chat_service import _hold_until_done
+
+def controller(**overrides) -> AdmissionController:
+    settings = dict(max_concurrent=1, max_queue=0, queue_timeout=0.1, user_rate=1 / 60, user_burst=2)
+    return AdmissionController(**{**settings, **overrides})
+
+def test_zero_rate_is_rejected_up_front():
+    with pytest.raises(ValueError):
+        controller(user_rate=0)
+
+@pytest.mark.anyio
+async def test_capacity_rejection_refunds_the_user_token():
+    admission = controller()
+    ticket = await admission.acquire("other-user")
+
+    for _ in range(3):
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.acquire("user")
+        assert rejected.value.reason == "queue_full"
+
+    ticket.release()
+    # Both burst tokens are still there
+    (await admission.acquire("user")).release()
+    (await admission.acquire("user")).release()
+    with pytest.raises(AdmissionRejected) as rejected:
+        await admission.acquire("user")
+    assert rejected.value.reason == "user_rate"
+
+@pytest.mark.anyio
+async def test_unused_stream_releases_its_slot_on_the_loop():
+    admission = controller(max_queue=1, queue_timeout=1.0)
+    ticket = await admission.acquire()
+
+    async def lines():
+        yield "line"
+
+    stream = _hold_until_done(ticket, lines())
+    waiter = asyncio.create_task(admission.acquire())
+    await asyncio.sleep(0)
+
+    # Drop the last reference to the never-iterated stream on another
+    # thread, as the garbage collector might
+    streams = [stream]
+    del stream
+    thread = threading.Thread(target=streams.clear)
+    thread.start()
+    thread.join()
+
+    (await asyncio.wait_for(waiter, 0.5)).release()
+    assert ticket.released
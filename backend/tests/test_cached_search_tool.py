@@ -0,0 +1,90 @@
+import time
+import asyncio
+import pytest
+from pydantic import BaseModel, Field
+from langchain_core.tools import BaseTool
+from src.modules.chat.tools.cached_search_tool import CachedSearchTool
+
+pytestmark = pytest.mark.anyio
+
+class SearchInput(BaseModel):
+    query: str
+
+class StubSearch(BaseTool):
+    """A search backend that records its queries and answers after `delay` seconds."""
+
+    name: str = "web_search"
+    description: str = "Search the web."
+    args_schema: type[BaseModel] = SearchInput
+    delay: float = 0.0
+    queries: list[str] = Field(default_factory=list)
+
+    def _run(self, query: str) -> list[dict]:
+        time.sleep(self.delay)
+        self.queries.append(query)
+        return [{"title": query, "snippet": f"Results for {query}"}]
+
+def cached(backend: StubSearch, ttl: float = 60, max_bytes: int = 100_000) -> CachedSearchTool:
+    return CachedSearchTool(backend, ttl=ttl, max_bytes=max_bytes)
+
+async def test_repeated_queries_are_served_from_the_cache():
+    backend = StubSearch()
+    tool = cached(backend)
+
+    first = await tool.ainvoke({"query": "Python asyncio"})
+    second = await tool.ainvoke({"query": "  python   ASYNCIO "})
+
+    assert second == first
+    assert backend.queries == ["Python asyncio"]
+    stats = tool.stats()
+    assert (stats["hits"], stats["misses"], stats["coalesced"]) == (1, 1, 0)
+    assert stats["size_bytes"] > 0
+
+async def test_entries_expire_after_the_ttl():
+    backend = StubSearch()
+    tool = cached(backend, ttl=0.05)
+
+    await tool.ainvoke({"query": "weather"})
+    await asyncio.sleep(0.1)
+    await tool.ainvoke({"query": "weather"})
+
+    assert backend.queries == ["weather", "weather"]
+
+async def test_concurrent_identical_queries_share_one_backend_call():
+    backend = StubSearch(delay=0.1)
+    tool = cached(backend)
+
+    results = await asyncio.gather(*(tool.ainvoke({"query": q}) for q in ["news", "News", "news ", "NEWS", "news"]))
+
+    assert len(backend.queries) == 1
+    assert all(result == results[0] for result in results)
+    assert tool.stats()["misses"] == 1
+    assert tool.stats()["coalesced"] == 4
+
+async def test_different_queries_are_not_coalesced():
+    backend = StubSearch(delay=0.05)
+    tool = cached(backend)
+
+    await asyncio.gather(tool.ainvoke({"query": "cats"}), tool.ainvoke({"query": "dogs"}))
+
+    assert sorted(backend.queries) == ["cats", "dogs"]
+
+async def test_results_larger_than_the_cache_are_served_but_not_kept():
+    backend = StubSearch()
+    tool = cached(backend, max_bytes=10)
+
+    result = await tool.ainvoke({"query": "a long query"})
+    await tool.ainvoke({"query": "a long query"})
+
+    assert result == [{"title": "a long query", "snippet": "Results for a long query"}]
+    assert len(backend.queries) == 2
+    assert tool.stats()["size_bytes"] == 0
+
+def test_sync_calls_share_the_cache():
+    backend = StubSearch()
+    tool = cached(backend)
+
+    tool.invoke({"query": "Rust"})
+    tool.invoke({"query": "rust"})
+
+    assert backend.queries == ["Rust"]
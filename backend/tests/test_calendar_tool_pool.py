@@ -0,0 +1,49 @@
+import asyncio
+from uuid import uuid4
+import pytest
+from src.modules.chat.tools import google_calendar_tool
+from src.modules.chat.tools.google_calendar_tool import CalendarToolPool
+
+pytestmark = pytest.mark.anyio
+
+class SlowCredentialsRepository:
+    """Returns whatever credentials were current when the read started, after `delay` seconds."""
+
+    def __init__(self, credentials: dict | None, delay: float = 0.05):
+        self.credentials = credentials
+        self.delay = delay
+        self.reads = 0
+
+    async def get_credentials(self, user_id):
+        self.reads += 1
+        credentials, delay = self.credentials, self.delay
+        await asyncio.sleep(delay)
+        return credentials
+
+@pytest.fixture(autouse=True)
+def fake_build(monkeypatch):
+    monkeypatch.setattr(google_calendar_tool, "build_calendar_tools", lambda info: [info["token"]])
+
+async def test_tools_are_built_once_and_cached():
+    repo = SlowCredentialsRepository({"token": "a"})
+    pool = CalendarToolPool(repo, max_users=10, ttl=60)
+    user_id = uuid4()
+
+    assert await asyncio.gather(pool.get_tools(user_id), pool.get_tools(user_id)) == [["a"], ["a"]]
+    assert await pool.get_tools(user_id) == ["a"]
+    assert repo.reads == 1
+
+async def test_build_in_flight_during_invalidate_is_not_cached():
+    repo = SlowCredentialsRepository({"token": "old"}, delay=0.1)
+    pool = CalendarToolPool(repo, max_users=10, ttl=60)
+    user_id = uuid4()
+
+    stale = asyncio.create_task(pool.get_tools(user_id))
+    await asyncio.sleep(0.01)
+    repo.credentials, repo.delay = {"token": "new"}, 0.01
+    pool.invalidate(user_id)
+
+    # The new build finishes first; the stale one must not overwrite it
+    assert await pool.get_tools(user_id) == ["new"]
+    assert await stale == ["old"]
+    assert await pool.get_tools(user_id) == ["new"]
@@ -0,0 +1,44 @@
+from uuid import uuid4
+import pytest
+from src.modules.chat.repositories.chat_repository import ChatRepository
+from src.modules.chat.repositories.history_cache import HistoryCache
+
+pytestmark = pytest.mark.anyio
+
+class FailingQuery:
+    """A query builder whose every call chains and whose execute() fails."""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    async def execute(self):
+        raise TimeoutError("database timed out")
+
+class FailingDatabase:
+    client = property(lambda self: self)
+
+    def table(self, name: str) -> FailingQuery:
+        return FailingQuery()
+
+def cached_repo(chat_id) -> ChatRepository:
+    cache = HistoryCache(max_chats=10, ttl=60)
+    cache.put(str(chat_id), [{"id": "1", "role": "user", "content": "hi"}])
+    return ChatRepository(FailingDatabase(), history_cache=cache)
+
+async def test_failed_insert_invalidates_the_cached_history():
+    chat_id = uuid4()
+    repo = cached_repo(chat_id)
+
+    with pytest.raises(TimeoutError):
+        await repo.add_message(chat_id, "assistant", "hello")
+
+    assert repo.history_cache.get(str(chat_id)) is None
+
+async def test_failed_read_releases_its_fill_token():
+    chat_id = uuid4()
+    repo = ChatRepository(FailingDatabase(), history_cache=HistoryCache(max_chats=10, ttl=60))
+
+    with pytest.raises(TimeoutError):
+        await repo.get_messages(chat_id)
+
+    assert repo.history_cache._pending_fills == {}
@@ -0,0 +1,27 @@
+import asyncio
+from uuid import uuid4
+import pytest
+from src.modules.chat import chat_service
+from src.modules.chat.chat_service import ChatService
+from tests.fakes import FailingInsertRepository
+
+pytestmark = pytest.mark.anyio
+
+async def test_failed_user_message_insert_cancels_the_answer(monkeypatch, admission):
+    cancelled = asyncio.Event()
+
+    async def ainvoke(messages, user_id=None):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def agenerate_title(message):
+        return "Title"
+    monkeypatch.setattr(chat_service.agent, "ainvoke", ainvoke)
+    monkeypatch.setattr(chat_service, "agenerate_title", agenerate_title)
+
+    with pytest.raises(TimeoutError):
+        await ChatService(FailingInsertRepository(), admission).create_chat(uuid4(), "Hello")
+    assert cancelled.is_set()
@@ -0,0 +1,72 @@
+import json
+import time
+import asyncio
+from uuid import uuid4
+import pytest
+from benchmarks.fake_openai_server import ANSWER
+from src.modules.chat.agents import main_agent
+from src.modules.chat import chat_service
+from src.modules.chat.chat_service import ChatService
+from tests.fakes import FailingInsertRepository
+
+FIRST_TOKEN_DELAY = 0.1
+CHUNK_DELAY = 0.1
+
+pytestmark = [pytest.mark.anyio, pytest.mark.usefixtures("no_tools")]
+
+async def test_stream_response_yields_first_chunk_before_the_answer_finishes(fake_openai, chat_repo, admission):
+    fake_openai.state.chunk_delay = CHUNK_DELAY
+    fake_openai.state.latencies["fake/fast"] = FIRST_TOKEN_DELAY
+    # Build the model client up front so its import time is not measured
+    main_agent.get_llm(main_agent.model_router.route_tier("fast").models)
+    service = ChatService(chat_repo, admission)
+
+    started = time.perf_counter()
+    response = await service.stream_response(uuid4(), uuid4(), "Hello there")
+    arrivals, deltas = [], []
+    async for line in response.body_iterator:
+        arrivals.append(time.perf_counter() - started)
+        deltas.append(json.loads(line)["content"])
+        if len(arrivals) == 1:
+            # Nothing is persisted for the assistant until the stream completes
+            assert [m["role"] for m in chat_repo.messages] == ["user"]
+
+    assert "".join(deltas) == ANSWER
+    assert len(arrivals) > 1
+    assert arrivals[0] < FIRST_TOKEN_DELAY + CHUNK_DELAY * 2
+    assert arrivals[-1] - arrivals[0] >= CHUNK_DELAY * (len(arrivals) - 2)
+    assert chat_repo.messages[-1] == {"role": "assistant", "content": ANSWER}
+
+async def test_only_the_final_turn_is_stored(monkeypatch, chat_repo, admission):
+    async def astream_events(messages, user_id=None):
+        for event in ["Let me check ", "your calendar.", main_agent.TOOL_TURN, "You are free ", "all day."]:
+            yield event
+    monkeypatch.setattr(chat_service.agent, "astream_events", astream_events)
+    service = ChatService(chat_repo, admission)
+
+    response = await service.stream_response(uuid4(), uuid4(), "Am I free today?")
+    deltas = [json.loads(line)["content"] async for line in response.body_iterator]
+
+    assert "".join(deltas) == "Let me check your calendar.You are free all day."
+    assert chat_repo.messages[-1] == {"role": "assistant", "content": "You are free all day."}
+
+async def test_failed_user_message_insert_stops_the_answer(monkeypatch, admission):
+    produced = []
+
+    async def astream_events(messages, user_id=None):
+        for word in ["one ", "two ", "three ", "four"]:
+            await asyncio.sleep(0.02)
+            produced.append(word)
+            yield word
+    monkeypatch.setattr(chat_service.agent, "astream_events", astream_events)
+    async def agenerate_title(message):
+        return "Title"
+    monkeypatch.setattr(chat_service, "agenerate_title", agenerate_title)
+    service = ChatService(FailingInsertRepository(), admission)
+
+    response = await service.create_chat_stream(uuid4(), "Hello")
+    with pytest.raises(TimeoutError):
+        async for _ in response.body_iterator:
+            pass
+
+    assert len(produced) < 4
@@ -0,0 +1,84 @@
+import asyncio
+from uuid import uuid4
+import pytest
+from benchmarks.fake_openai_server import ANSWER
+from src.core.config import config
+from src.modules.chat import chat_service
+from src.modules.chat.chat_service import ChatService
+from src.modules.chat.context_builder import ContextBuilder
+from tests.fakes import FakeChatRepository
+
+pytestmark = pytest.mark.anyio
+
+def transcript(count: int) -> list[dict]:
+    return [{"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i}"} for i in range(count)]
+
+async def test_history_is_the_summary_plus_unsummarized_turns(admission):
+    repo = FakeChatRepository(transcript(30), {"summary": "Earlier: talked about Paris.", "message_count": 20})
+    service = ChatService(repo, admission)
+
+    messages, unsummarized = await service._build_history(uuid4(), "And now?")
+
+    assert messages[0]["role"] == "system"
+    assert messages[1] == {"role": "system", "content": "Summary of the earlier conversation:\nEarlier: talked about Paris."}
+    assert messages[2:] == [*transcript(30)[20:], {"role": "user", "content": "And now?"}]
+    assert unsummarized == 11
+
+async def test_history_window_keeps_the_most_recent_turns(admission):
+    repo = FakeChatRepository(transcript(30))
+    builder = ContextBuilder(system_prompt="system", max_tokens=10_000, max_messages=5)
+    service = ChatService(repo, admission, context_builder=builder)
+
+    messages, unsummarized = await service._build_history(uuid4(), "Latest")
+
+    assert messages == [{"role": "system", "content": "system"}, *transcript(30)[-4:], {"role": "user", "content": "Latest"}]
+    assert unsummarized == 31
+
+async def test_summary_is_refreshed_off_the_request_path(fake_openai, no_tools, admission):
+    # Two short of the threshold, so this turn's user and assistant messages trigger a refresh
+    threshold = config.summary_keep_recent + config.summary_refresh_interval
+    repo = FakeChatRepository(transcript(threshold - 2))
+    service = ChatService(repo, admission)
+    chat_id = uuid4()
+
+    response = await service.stream_response(chat_id, uuid4(), "Hello")
+    async for _ in response.body_iterator:
+        pass
+    assert repo.summary is None
+
+    await asyncio.gather(*service._summary_tasks.values())
+    assert repo.summary == {"summary": ANSWER, "message_count": threshold - config.summary_keep_recent}
+    assert config.summary_model in fake_openai.state.requests
+
+async def test_summary_refresh_folds_only_new_turns_into_the_previous_summary(monkeypatch, admission):
+    calls = []
+
+    async def asummarize(previous_summary, messages):
+        calls.append((previous_summary, messages))
+        return "updated"
+    monkeypatch.setattr(chat_service, "asummarize", asummarize)
+
+    messages = transcript(40)
+    repo = FakeChatRepository(messages, {"summary": "previous", "message_count": 10})
+    await ChatService(repo, admission)._refresh_summary(uuid4())
+
+    upto = len(messages) - config.summary_keep_recent
+    assert calls == [("previous", messages[10:upto])]
+    assert repo.saved_summaries == [("updated", upto)]
+
+async def test_summary_refresh_waits_for_enough_new_turns(monkeypatch, admission):
+    calls = []
+
+    async def asummarize(previous_summary, messages):
+        calls.append((previous_summary, messages))
+        return "updated"
+    monkeypatch.setattr(chat_service, "asummarize", asummarize)
+
+    service = ChatService(FakeChatRepository(transcript(25), {"summary": "previous", "message_count": 10}), admission)
+    service._schedule_summary_refresh(uuid4(), config.summary_keep_recent + config.summary_refresh_interval - 1)
+    assert not service._summary_tasks
+
+    # Scheduled, but the stored summary already covers all but 15 turns
+    await service._refresh_summary(uuid4())
+    assert calls == []
+    assert service.repo.saved_summaries == []
@@ -0,0 +1,75 @@
+import asyncio
+import pytest
+from src.common.idempotency import (
+    Idempotency,
+    IdempotencyInProgress,
+    IdempotencyKeyReused,
+    InMemoryIdempotencyStore,
+)
+
+pytestmark = pytest.mark.anyio
+
+async def lines(*items: str):
+    for item in items:
+        await asyncio.sleep(0.01)
+        yield item
+
+async def collect(stream) -> list[str]:
+    return [line async for line in stream]
+
+async def test_retry_during_start_joins_the_running_stream():
+    idempotency = Idempotency(InMemoryIdempotencyStore())
+    starts = []
+
+    async def start():
+        starts.append(1)
+        await asyncio.sleep(0.05)
+        return lines("a", "b", "c")
+
+    first, retry = await asyncio.gather(
+        idempotency.stream("key", "fp", start),
+        idempotency.stream("key", "fp", start),
+    )
+
+    assert await asyncio.gather(collect(first), collect(retry)) == [["a", "b", "c"]] * 2
+    assert len(starts) == 1
+    assert await collect(await idempotency.stream("key", "fp", start)) == ["a", "b", "c"]
+
+async def test_retry_of_a_failed_start_is_told_to_retry():
+    idempotency = Idempotency(InMemoryIdempotencyStore())
+
+    async def start():
+        await asyncio.sleep(0.05)
+        raise RuntimeError("upstream down")
+
+    first, retry = await asyncio.gather(
+        idempotency.stream("key", "fp", start),
+        idempotency.stream("key", "fp", start),
+        return_exceptions=True,
+    )
+
+    assert isinstance(first, RuntimeError)
+    with pytest.raises(IdempotencyInProgress):
+        await collect(retry)
+    assert await idempotency.store.get("key") is None
+
+async def test_key_reused_for_a_different_request():
+    idempotency = Idempotency(InMemoryIdempotencyStore())
+
+    async def compute():
+        return {"ok": True}
+
+    assert await idempotency.run("key", "fp", compute) == {"ok": True}
+    with pytest.raises(IdempotencyKeyReused):
+        await idempotency.run("key", "other", compute)
+
+async def test_request_running_in_another_process():
+    store = InMemoryIdempotencyStore()
+    await store.claim("key", "fp")
+    idempotency = Idempotency(store)
+
+    async def start():
+        return lines("a")
+
+    with pytest.raises(IdempotencyInProgress):
+        await idempotency.stream("key", "fp", start)
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import pytest
+from postgrest.exceptions import APIError
+from src.modules.chat.repositories.message_write_behind import MessageWriteBehind
+
+pytestmark = pytest.mark.anyio
+
+class FakeTable:
+    def __init__(self, db: "FakeDatabase"):
+        self.db = db
+        self.rows = None
+
+    def upsert(self, rows, **kwargs):
+        self.rows = rows
+        return self
+
+    async def execute(self):
+        return self.db.write(self.rows)
+
+class FakeDatabase:
+    """A database that is down for `outage` writes and rejects rows by content."""
+
+    def __init__(self, outage: int = 0, reject: str | None = None):
+        self.outage = outage
+        self.reject = reject
+        self.rows: list[dict] = []
+
+    @property
+    def client(self):
+        return self
+
+    def table(self, name: str) -> FakeTable:
+        return FakeTable(self)
+
+    def write(self, rows: list[dict]) -> None:
+        if self.outage:
+            self.outage -= 1
+            raise ConnectionError("database unavailable")
+        if any(row["content"] == self.reject for row in rows):
+            raise APIError({"code": "23503", "message": "foreign key violation"})
+        self.rows.extend(rows)
+
+def message(chat_id: str, content: str) -> dict:
+    return {"chat_id": chat_id, "role": "user", "content": content}
+
+async def test_rows_survive_an_outage_and_stay_readable():
+    db = FakeDatabase(outage=8)
+    buffer = MessageWriteBehind(db, flush_interval=0.01, max_backoff=0.02)
+    buffer.start()
+
+    row = buffer.enqueue(message("chat", "hello"))
+    await asyncio.sleep(0.1)
+    assert db.rows == []
+    assert buffer.pending("chat") == [row]
+
+    await buffer.stop()
+    assert db.rows == [row]
+    assert buffer.pending("chat") == []
+
+async def test_only_rejected_rows_are_dropped(caplog):
+    db = FakeDatabase(reject="secret bad row")
+    buffer = MessageWriteBehind(db, flush_interval=0.05)
+    dropped_chats = []
+    buffer.on_drop = dropped_chats.append
+    buffer.start()
+
+    rows = [buffer.enqueue(message("chat", f"message {i}")) for i in range(5)]
+    bad = buffer.enqueue(message("chat", "secret bad row"))
+    rows += [buffer.enqueue(message("chat", f"message {i}")) for i in range(5, 10)]
+    with caplog.at_level(logging.ERROR):
+        await buffer.stop()
+
+    assert sorted(r["id"] for r in db.rows) == sorted(r["id"] for r in rows)
+    assert buffer.pending("chat") == []
+    assert dropped_chats == ["chat"]
+    assert bad["id"] in caplog.text
+    assert "secret bad row" not in caplog.text
+
+async def test_stop_gives_up_when_the_database_stays_down(caplog):
+    db = FakeDatabase(outage=10_000)
+    buffer = MessageWriteBehind(db, flush_interval=0.01, max_backoff=0.01, stop_timeout=0.1)
+    buffer.start()
+
+    row = buffer.enqueue(message("chat", "private"))
+    with caplog.at_level(logging.ERROR):
+        await buffer.stop()
+
+    assert row["id"] in caplog.text
+    assert "private" not in caplog.text
@@ -0,0 +1,74 @@
+import pytest
+from prometheus_client import REGISTRY
+from src.modules.chat.agents import main_agent
+from src.modules.chat.agents.model_router import ModelRouter
+
+def make_router(**overrides) -> ModelRouter:
+    settings = dict(
+        fast_models=["fast-a", "fast-b"],
+        strong_models=["strong-a"],
+        fast_max_prompt_tokens=200,
+        fast_max_message_chars=100,
+        fast_max_tools=1,
+    )
+    return ModelRouter(**{**settings, **overrides})
+
+def user(content: str) -> dict:
+    return {"role": "user", "content": content}
+
+def decisions(tier: str, reason: str, model: str) -> float:
+    labels = {"tier": tier, "reason": reason, "model": model}
+    return REGISTRY.get_sample_value("llm_router_decisions_total", labels) or 0.0
+
+def test_short_turns_go_to_the_fast_tier():
+    decision = make_router().route([user("What time is it in Tokyo?")], {"web_search": object()})
+
+    assert (decision.tier, decision.reason) == ("fast", "short")
+    assert decision.model == "fast-a"
+
+def test_more_tools_than_the_fast_tier_handles_go_to_the_strong_tier():
+    tools = {"web_search": object(), "create_event": object()}
+    decision = make_router().route([user("Book lunch tomorrow")], tools)
+
+    assert (decision.tier, decision.reason) == ("strong", "tools")
+
+def test_long_latest_message_goes_to_the_strong_tier():
+    decision = make_router().route([user("x" * 101)], {})
+
+    assert (decision.tier, decision.reason) == ("strong", "long_message")
+
+def test_long_context_goes_to_the_strong_tier():
+    history = [user("a short question about the weather") for _ in range(20)]
+    decision = make_router().route(history, {})
+
+    assert (decision.tier, decision.reason) == ("strong", "long_context")
+
+def test_tools_take_precedence_over_message_length():
+    tools = {"web_search": object(), "create_event": object()}
+    decision = make_router().route([user("x" * 500)], tools)
+
+    assert decision.reason == "tools"
+
+def test_each_tier_falls_back_to_the_other_tier():
+    router = make_router(strong_models=["strong-a", "fast-b"])
+
+    assert router.route_tier("fast").models == ("fast-a", "fast-b", "strong-a")
+    assert router.route_tier("strong").models == ("strong-a", "fast-b", "fast-a")
+
+def test_decisions_are_exported():
+    before = decisions("strong", "long_message", "strong-a")
+    make_router().route([user("x" * 101)], {})
+
+    assert decisions("strong", "long_message", "strong-a") == before + 1
+
+@pytest.mark.anyio
+async def test_agent_calls_the_routed_model(fake_openai, no_tools):
+    await main_agent.ainvoke([user("Hi!")])
+    await main_agent.ainvoke([user("Please explain this in detail. " * 40)])
+
+    fast_model = main_agent.model_router.tiers["fast"][0]
+    strong_model = main_agent.model_router.tiers["strong"][0]
+    assert fake_openai.state.requests == [fast_model, strong_model]
+    for model in (fast_model, strong_model):
+        labels = {"model": model, "outcome": "ok"}
+        assert REGISTRY.get_sample_value("llm_request_duration_seconds_count", labels) >= 1
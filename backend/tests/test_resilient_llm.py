@@ -0,0 +1,137 @@
+import time
+import asyncio
+import pytest
+from openai import BadRequestError
+from benchmarks.fake_openai_server import ANSWER
+from src.common.concurrency import CircuitBreaker
+from src.modules.chat.agents.llm_factory import get_chat_model
+from src.modules.chat.agents.resilient_llm import Endpoint, ResilientChatModel
+
+PROMPT = [{"role": "user", "content": "Hello"}]
+
+def resilient(*models: str, hedge_delay: float | None = None, failure_threshold: int = 3) -> ResilientChatModel:
+    # Breakers are created per test; the shared ones from llm_factory would
+    # carry state between tests
+    return ResilientChatModel(
+        [
+            Endpoint(model, get_chat_model(model, 0, max_retries=0), CircuitBreaker(failure_threshold, reset_timeout=60))
+            for model in models
+        ],
+        hedge_delay=hedge_delay,
+    )
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == "closed"
+
+def test_half_open_breaker_lets_one_probe_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.release()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+@pytest.mark.anyio
+async def test_fast_primary_is_not_hedged(fake_openai):
+    llm = resilient("hedge/fast-primary", "hedge/backup", hedge_delay=0.2)
+
+    response = await llm.ainvoke(PROMPT)
+
+    assert response.content == ANSWER
+    assert fake_openai.state.requests == ["hedge/fast-primary"]
+
+@pytest.mark.anyio
+async def test_slow_primary_is_hedged_and_the_first_answer_wins(fake_openai):
+    fake_openai.state.latencies.update({"hedge/slow-primary": 2.0, "hedge/backup": 0.01})
+    llm = resilient("hedge/slow-primary", "hedge/backup", hedge_delay=0.1)
+
+    started = time.perf_counter()
+    response = await llm.ainvoke(PROMPT)
+
+    assert response.content == ANSWER
+    assert time.perf_counter() - started < 1.0
+    assert fake_openai.state.requests == ["hedge/slow-primary", "hedge/backup"]
+    # The losing attempt was cancelled, which does not count against it
+    assert llm.endpoints[0].breaker.failures == 0
+
+@pytest.mark.anyio
+async def test_slow_tail_is_hedged(fake_openai):
+    fake_openai.state.slow_tail["hedge/tail-primary"] = (1.0, 2.0)
+    llm = resilient("hedge/tail-primary", "hedge/backup", hedge_delay=0.1)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(llm.ainvoke(PROMPT) for _ in range(3)))
+
+    assert time.perf_counter() - started < 1.0
+    assert fake_openai.state.requests.count("hedge/backup") == 3
+
+@pytest.mark.anyio
+async def test_rate_limited_primary_fails_over(fake_openai):
+    fake_openai.state.errors["hedge/limited"] = 429
+    llm = resilient("hedge/limited", "hedge/backup")
+
+    response = await llm.ainvoke(PROMPT)
+
+    assert response.content == ANSWER
+    assert fake_openai.state.requests == ["hedge/limited", "hedge/backup"]
+    assert llm.endpoints[0].breaker.failures == 1
+    assert llm.endpoints[1].breaker.failures == 0
+
+@pytest.mark.anyio
+async def test_open_breaker_skips_the_failing_endpoint(fake_openai):
+    fake_openai.state.errors["hedge/down"] = 503
+    llm = resilient("hedge/down", "hedge/backup", failure_threshold=2)
+
+    for _ in range(4):
+        assert (await llm.ainvoke(PROMPT)).content == ANSWER
+
+    assert fake_openai.state.requests.count("hedge/down") == 2
+    assert fake_openai.state.requests.count("hedge/backup") == 4
+    assert llm.endpoints[0].breaker.state == "open"
+
+@pytest.mark.anyio
+async def test_every_breaker_open_still_calls_the_primary(fake_openai):
+    llm = resilient("hedge/recovered", "hedge/backup", failure_threshold=1)
+    for endpoint in llm.endpoints:
+        endpoint.breaker.record_failure()
+
+    assert (await llm.ainvoke(PROMPT)).content == ANSWER
+    assert fake_openai.state.requests == ["hedge/recovered"]
+
+@pytest.mark.anyio
+async def test_bad_request_is_not_retried_elsewhere(fake_openai):
+    fake_openai.state.errors["hedge/rejects"] = 400
+    llm = resilient("hedge/rejects", "hedge/backup", failure_threshold=1)
+
+    with pytest.raises(BadRequestError):
+        await llm.ainvoke(PROMPT)
+
+    assert fake_openai.state.requests == ["hedge/rejects"]
+    assert llm.endpoints[0].breaker.state == "closed"
@@ -0,0 +1,56 @@
+import pytest
+from src.modules.chat.response_cache import ResponseCache
+
+MODEL = "model"
+SYSTEM = "You are helpful."
+
+def cache(similarity_threshold: float | None = 0.9, max_entries: int = 100) -> ResponseCache:
+    return ResponseCache(max_entries=max_entries, ttl=60, similarity_threshold=similarity_threshold)
+
+def test_exact_hit_ignores_case_whitespace_and_trailing_punctuation():
+    responses = cache(similarity_threshold=None)
+    responses.set(MODEL, SYSTEM, "What is the capital of France?", "Paris")
+
+    assert responses.get(MODEL, SYSTEM, "what is  the capital of france") == "Paris"
+    assert responses.exact_hits == 1
+
+def test_rephrasing_in_filler_words_is_a_similarity_hit():
+    responses = cache()
+    responses.set(MODEL, SYSTEM, "What is the capital of France?", "Paris")
+
+    assert responses.get(MODEL, SYSTEM, "what's the capital of france") == "Paris"
+    assert responses.semantic_hits == 1
+
+@pytest.mark.parametrize("prompt", [
+    "What is the capital of Germany?",
+    "What is the capital of France in 1800?",
+    "France capital of the what",
+    "What is not the capital of France?",
+])
+def test_different_content_words_never_match(prompt):
+    responses = cache(similarity_threshold=0.0)
+    responses.set(MODEL, SYSTEM, "What is the capital of France?", "Paris")
+
+    assert responses.get(MODEL, SYSTEM, prompt) is None
+
+def test_similarity_tier_can_be_disabled():
+    responses = cache(similarity_threshold=None)
+    responses.set(MODEL, SYSTEM, "What is the capital of France?", "Paris")
+
+    assert responses.get(MODEL, SYSTEM, "what's the capital of france") is None
+
+def test_entries_are_scoped_to_model_and_system_prompt():
+    responses = cache()
+    responses.set(MODEL, SYSTEM, "What is the capital of France?", "Paris")
+
+    assert responses.get("other", SYSTEM, "What is the capital of France?") is None
+    assert responses.get(MODEL, "Answer in French.", "what's the capital of france") is None
+
+def test_evicted_entries_are_not_found_by_similarity():
+    responses = cache(max_entries=1)
+    responses.set(MODEL, SYSTEM, "What is the capital of France?", "Paris")
+    responses.set(MODEL, SYSTEM, "What is the capital of Spain?", "Madrid")
+
+    assert responses.get(MODEL, SYSTEM, "what's the capital of france") is None
+    assert responses.get(MODEL, SYSTEM, "what's the capital of spain") == "Madrid"
+    assert responses.stats()["size"] == 1
@@ -0,0 +1,32 @@
+import json
+import asyncio
+import pytest
+from langchain_core.tools import StructuredTool
+from src.modules.chat.agents.tool_loop import arun_tool_calls
+
+pytestmark = pytest.mark.anyio
+
+async def slow_lookup(query: str) -> str:
+    await asyncio.sleep(0.05)
+    return f"found {query}"
+
+async def broken_lookup(query: str) -> str:
+    raise RuntimeError("backend exploded")
+
+TOOLS = {
+    "slow": StructuredTool.from_function(coroutine=slow_lookup, name="slow", description="Slow lookup."),
+    "broken": StructuredTool.from_function(coroutine=broken_lookup, name="broken", description="Broken lookup."),
+}
+
+def call(call_id: str, name: str) -> dict:
+    return {"id": call_id, "name": name, "args": {"query": "x"}}
+
+async def test_every_tool_call_gets_an_answer_in_order():
+    messages = []
+
+    await arun_tool_calls(messages, [call("1", "broken"), call("2", "slow"), call("3", "made_up")], TOOLS)
+
+    assert [m["tool_call_id"] for m in messages] == ["1", "2", "3"]
+    assert json.loads(messages[0]["content"]) == {"error": "RuntimeError", "tool": "broken", "message": "backend exploded"}
+    assert messages[1]["content"] == "found x"
+    assert json.loads(messages[2]["content"]) == {"error": "unknown_tool", "tool": "made_up"}